@@ -1,4 +1,5 @@
 import logging
+import re
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 
@@ -19,6 +20,16 @@ from workflow.schemas import ToolUsage
 
 logger = logging.getLogger(__name__)
 
+# Query indicators that suggest live tool lookups are needed, matched as word-token prefixes
+# so inflections like "hashed" or "exploitable" count but "research" and "renewal" don't
+TOOL_REQUIRED_STEMS = (
+    "analy", "check", "search", "investigat", "domain", "subdomain", "hash", "url", "cve", "email",
+    "latest", "recent", "current", "new", "today", "gdpr", "hipaa", "sox",
+    "vulnerab", "patch", "exploit"
+)
+TOOL_REQUIRED_PHRASES = ("look up", "ip address", "pci-dss", "compliance check")
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
 
 class BaseSecurityAgent(ABC):
     """
@@ -50,6 +61,8 @@ class BaseSecurityAgent(ABC):
         self.max_tokens: int = self.config.get("max_tokens", 4000)
         
         self.output_parser = PydanticOutputParser(pydantic_object=AgentResponse)
+        # The AgentResponse JSON schema never changes, so render it into the prompt once
+        self.format_instructions = self.output_parser.get_format_instructions()
         
         self.retry_parser = OutputFixingParser.from_llm(
             parser=self.output_parser,
@@ -87,28 +100,12 @@ class BaseSecurityAgent(ABC):
                 query_content = msg.content.lower()
                 break
         
-        tool_required_indicators = [
-            'analyze', 'check', 'search', 'look up', 'investigate',
-            'ip address', 'domain', 'hash', 'url', 'cve-', 'email',
-            'latest', 'recent', 'current', 'new', 'today',
-            'gdpr', 'hipaa', 'pci-dss', 'sox', 'compliance check',
-            'vulnerability', 'cve', 'patch', 'exploit'
-        ]
-        
-        general_knowledge_indicators = [
-            'what is', 'what are', 'how to', 'explain', 'define',
-            'best practices', 'recommendations', 'approach', 'strategy',
-            'weird task', 'strange process', 'suspicious activity',
-            'high cpu', 'high ram', 'slow performance'
-        ]
-        
-        if any(indicator in query_content for indicator in tool_required_indicators):
+        tokens = set(_TOKEN_PATTERN.findall(query_content))
+        if any(token.startswith(TOOL_REQUIRED_STEMS) for token in tokens):
             return True
-            
-        if any(indicator in query_content for indicator in general_knowledge_indicators):
-            return False
-            
-        return False
+        
+        # Multi-word indicators only need a substring scan when no single word matched
+        return any(phrase in query_content for phrase in TOOL_REQUIRED_PHRASES)
 
     @observe(name="agent_respond")
     async def respond(self, messages: List[Any]) -> AgentResponse:
@@ -117,7 +114,7 @@ class BaseSecurityAgent(ABC):
         Includes intelligent tool usage assessment.
         """
         system_prompt = self.get_system_prompt()
-        format_instructions = self.output_parser.get_format_instructions()
+        format_instructions = self.format_instructions
         
         prompt = ChatPromptTemplate.from_messages([
             ("system", "{system_prompt}\n\n{format_instructions}"),
@@ -82,22 +82,12 @@ AGENT_EVALUATION_CRITERIA = {
 }
 
 # --- Enhanced Validation Prompt ---
+# Judge templates keep their static instructions first and the per-request fields at the
+# tail, so every call shares the longest possible prefix for provider-side prompt caching.
 VALIDATE_RESPONSE_PROMPT = """
 You are evaluating a cybersecurity specialist's response. Use role-specific criteria to assess quality and appropriateness.
 Structure your evaluation using proper markdown formatting with headers, bullet points, and clear sections.
 
-**Query Context:**
-{query}
-
-**Agent Type & Role:**
-{agent_type}
-
-**Agent Response:**
-{response}
-
-**Role-Specific Evaluation Criteria:**
-{evaluation_criteria}
-
 **Evaluation Framework:**
 Provide your assessment using the following markdown structure:
 
@@ -168,6 +158,18 @@ Provide your assessment using the following markdown structure:
 - Coordinator: 5.5+ (synthesis and communication)
 
 Provide detailed feedback on role adherence, tool usage appropriateness, and specialist value delivered.
+
+**Role-Specific Evaluation Criteria:**
+{evaluation_criteria}
+
+**Agent Type & Role:**
+{agent_type}
+
+**Query Context:**
+{query}
+
+**Agent Response:**
+{response}
 """
 
 # --- Enhanced Enhancement Prompt ---
@@ -214,12 +216,6 @@ CHECK_GROUNDEDNESS_PROMPT = """
 Evaluate whether this cybersecurity response is properly grounded in the provided tool data and evidence.
 Structure your analysis using markdown formatting for clarity.
 
-**Tool Context/Evidence:**
-{context}
-
-**Agent Response to Verify:**
-{answer}
-
 **Groundedness Criteria for Cybersecurity:**
 Provide your assessment using this markdown structure:
 
@@ -259,6 +255,23 @@ Are regulatory requirements cited from official guidance tools?
 - General cybersecurity best practices may not require tool grounding
 - Specific threat assessments, CVE details, and compliance requirements must be grounded
 - Agent expertise can supplement but not replace tool-provided data for specific queries
+
+**Tool Context/Evidence:**
+{context}
+
+**Agent Response to Verify:**
+{answer}
+"""
+
+# --- Compact Groundedness Prompt (JSON mode) ---
+CHECK_GROUNDEDNESS_FAST_PROMPT = """Is every specific security claim in the statement supported by the context? General best practices need no support.
+Reply with JSON only: {{"grounded": true|false, "feedback": "<one or two sentences naming any unsupported claims>"}}
+
+Context:
+{context}
+
+Statement:
+{answer}
 """
 
 # --- Enhanced Relevance Prompt ---
@@ -266,12 +279,6 @@ CHECK_RELEVANCE_PROMPT = """
 Evaluate the relevance of retrieved cybersecurity context for answering the user's security query.
 Structure your evaluation using markdown formatting.
 
-**User Security Query:**
-{query}
-
-**Retrieved Context:**
-{context}
-
 **Relevance Criteria for Cybersecurity Context:**
 Provide your assessment using this markdown structure:
 
@@ -314,6 +321,12 @@ Does context cover the right security domain (compliance, threats, vulnerabiliti
 - Compliance queries need specific regulatory framework details
 - Incident response queries need actionable, immediate information
 - Prevention queries benefit from strategic, architectural context
+
+**User Security Query:**
+{query}
+
+**Retrieved Context:**
+{context}
 """
 
 # --- Agent Role Context Templates ---
@@ -25,6 +25,115 @@ class Settings(BaseSettings):
         env="DEFAULT_MODEL",
         description="Default language model for agents"
     )
+    routing_cache_size: int = Field(
+        4096,
+        env="ROUTING_CACHE_SIZE",
+        ge=0,
+        description="Maximum cached query classifications and triage decisions (0 disables the cache)"
+    )
+    routing_cache_ttl_seconds: float = Field(
+        3600.0,
+        env="ROUTING_CACHE_TTL_SECONDS",
+        gt=0,
+        description="How long cached routing results stay valid"
+    )
+    routing_cache_path: Optional[str] = Field(
+        None,
+        env="ROUTING_CACHE_PATH",
+        description="SQLite file that persists routing caches across restarts and worker processes (unset keeps them in memory)"
+    )
+    semantic_routing_cache_enabled: bool = Field(
+        False,
+        env="SEMANTIC_ROUTING_CACHE_ENABLED",
+        description="Reuse routing decisions for near-duplicate queries matched by embedding similarity"
+    )
+    semantic_routing_cache_threshold: float = Field(
+        0.95,
+        env="SEMANTIC_ROUTING_CACHE_THRESHOLD",
+        ge=0.0,
+        le=1.0,
+        description="Minimum cosine similarity for a semantic routing cache hit"
+    )
+    semantic_routing_cache_size: int = Field(
+        512,
+        env="SEMANTIC_ROUTING_CACHE_SIZE",
+        ge=0,
+        description="Maximum routing decisions kept in the semantic cache"
+    )
+    router_hedge_after_seconds: float = Field(
+        0.0,
+        env="ROUTER_HEDGE_AFTER_SECONDS",
+        ge=0.0,
+        description="Send a second routing request if the first is still running after this long (0 disables hedging)"
+    )
+    router_classification_model_name: str = Field(
+        "gpt-4o-mini",
+        env="ROUTER_CLASSIFICATION_MODEL_NAME",
+        description="Smaller language model for the router's cybersecurity pre-check"
+    )
+    classification_escalation_confidence: float = Field(
+        0.75,
+        env="CLASSIFICATION_ESCALATION_CONFIDENCE",
+        ge=0.0,
+        le=1.0,
+        description="Classifications below this confidence are re-run on the main router model"
+    )
+    triage_cascade_enabled: bool = Field(
+        True,
+        env="TRIAGE_CASCADE_ENABLED",
+        description="Run fused triage on the classification model first, escalating complex, incomplete or non-cybersecurity decisions"
+    )
+    compact_triage_prompt_enabled: bool = Field(
+        False,
+        env="COMPACT_TRIAGE_PROMPT_ENABLED",
+        description="Use the condensed triage instructions, which carry the same routing rules in fewer tokens"
+    )
+    embedding_classifier_enabled: bool = Field(
+        False,
+        env="EMBEDDING_CLASSIFIER_ENABLED",
+        description="Decide clear-cut cybersecurity classifications with a local embedding classifier before any LLM call"
+    )
+    embedding_classifier_min_margin: float = Field(
+        0.08,
+        env="EMBEDDING_CLASSIFIER_MIN_MARGIN",
+        ge=0.0,
+        description="Minimum similarity gap between the two class centroids for the embedding classifier to decide"
+    )
+    judge_model_name: str = Field(
+        "gpt-4o-mini",
+        env="JUDGE_MODEL_NAME",
+        description="Language model for quality-gate judges"
+    )
+    quality_gate_sample_rate: float = Field(
+        1.0,
+        env="QUALITY_GATE_SAMPLE_RATE",
+        ge=0.0,
+        le=1.0,
+        description="Fraction of responses sent to the LLM quality judge"
+    )
+    groundedness_fast_path: bool = Field(
+        True,
+        env="GROUNDEDNESS_FAST_PATH",
+        description="Use the compact JSON-mode groundedness judge before the full structured one"
+    )
+    judge_context_max_tokens: int = Field(
+        3000,
+        env="JUDGE_CONTEXT_MAX_TOKENS",
+        gt=0,
+        description="Approximate token budget for retrieved context sent to RAG judges"
+    )
+    judge_max_concurrency: int = Field(
+        8,
+        env="JUDGE_MAX_CONCURRENCY",
+        gt=0,
+        description="Maximum concurrent quality-gate judge calls"
+    )
+    judge_cache_size: int = Field(
+        1024,
+        env="JUDGE_CACHE_SIZE",
+        ge=0,
+        description="Maximum cached quality-gate verdicts (0 disables the cache)"
+    )
 
     api_host: str = Field(
         ...,
@@ -10,6 +10,7 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from conversation.config import ConversationConfig
+from utils.http import get_openai_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +24,8 @@ class ConversationSummarizer:
         self.llm = llm or ChatOpenAI(
             model=self.config.summarization_model,
             temperature=0.1,
-            max_tokens=500
+            max_tokens=500,
+            http_async_client=get_openai_http_client()
         )
     
     async def summarize_conversation(
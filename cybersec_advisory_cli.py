@@ -23,10 +23,12 @@ if dotenv_path.exists():
 else:
     print(f"WARNING: .env file not found at {dotenv_path}.")
 
+from utils.http import get_openai_http_client
 from utils.logging import setup_logging
 from conversation.manager import ConversationManager
 from conversation.config import ConversationConfig
 from workflow.graph import CybersecurityTeamGraph
+from workflow.quality_gates import stop_score_worker
 from config.settings import settings
 
 setup_logging(level=logging.INFO, log_to_console=True)
@@ -46,7 +48,8 @@ async def initialize_system():
     llm_client = ChatOpenAI(
         model=settings.default_model,
         temperature=0.1,
-        max_tokens=4000
+        max_tokens=4000,
+        http_async_client=get_openai_http_client()
     )
     
     config = ConversationConfig.from_env()
@@ -103,6 +106,8 @@ def chat(
         finally:
             if manager:
                 await manager.cleanup()
+            # Sends any quality scores still queued before the loop closes
+            await stop_score_worker()
 
     asyncio.run(run_conversation())
 
@@ -10,6 +10,7 @@ from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 from openai import AsyncOpenAI
 from config.settings import settings
+from utils.http import get_openai_http_client
 
 if TYPE_CHECKING:
     from knowledge.knowledge_retrieval import KnowledgeRetriever
@@ -34,7 +35,10 @@ class CybersecurityToolkit(BaseModel):
 
     def __init__(self, knowledge_retriever: Optional["KnowledgeRetriever"] = None, **data):
         super().__init__(**data)
-        llm_client = AsyncOpenAI(api_key=settings.get_secret("openai_api_key"))
+        llm_client = AsyncOpenAI(
+            api_key=settings.get_secret("openai_api_key"),
+            http_client=get_openai_http_client()
+        )
         
         # Create tools with proper dependency injection
         self.tools = [
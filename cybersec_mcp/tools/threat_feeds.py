@@ -4,7 +4,7 @@ Search for threat intelligence reports (Pulses) on AlienVault OTX.
 
 import logging
 from typing import List, Optional, Union
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from langchain_core.tools import BaseTool
 import httpx
 from config.settings import settings
@@ -50,6 +50,10 @@ class ThreatFeedResponse(BaseModel):
     error: Optional[str] = None
 
 
+# Validates a whole page of search results in one call instead of one call per pulse
+_pulse_summaries_adapter = TypeAdapter(List[ThreatPulseSummary])
+
+
 class ThreatFeedsTool(BaseTool):
     """Tool for searching threat intelligence feeds via AlienVault OTX"""
     name: str = "threat_feeds"
@@ -142,8 +146,7 @@ class ThreatFeedsTool(BaseTool):
                 final_pulses = [pulse for pulse in detailed_pulses_results if pulse is not None]
             else:
                 # Otherwise, just parse the summary data we already have using the new model
-                for summary in pulse_summaries:
-                    final_pulses.append(ThreatPulseSummary.model_validate(summary))
+                final_pulses = _pulse_summaries_adapter.validate_python(pulse_summaries)
 
             return ThreatFeedResponse(
                 query=query,
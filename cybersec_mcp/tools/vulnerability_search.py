@@ -4,32 +4,16 @@ Simple vulnerability search tool using NIST NVD API with Pydantic models.
 
 import logging
 from typing import List, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import ConfigDict
 from langchain_core.tools import BaseTool
 import httpx
 from config.settings import settings
 import asyncio
 from datetime import datetime, timezone, timedelta
 
-logger = logging.getLogger(__name__)
-
-
-class CVEResult(BaseModel):
-    """Individual CVE result"""
-    cve_id: str
-    description: str
-    severity: str = "UNKNOWN"
-    cvss_score: float = 0.0
-    published_date: str
+from .schemas import CVEResult, VulnerabilitySearchResponse
 
-
-class VulnerabilitySearchResponse(BaseModel):
-    """Response model for vulnerability search"""
-    status: str = "success"
-    query: str
-    total_results: int
-    results: List[CVEResult]
-    error: Optional[str] = None
+logger = logging.getLogger(__name__)
 
 
 class VulnerabilitySearchTool(BaseTool):
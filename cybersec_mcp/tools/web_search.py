@@ -2,8 +2,8 @@
 Web search tool using Tavily API with LLM-enhanced query optimization and proper time filtering.
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, ValidationError, ConfigDict
+from typing import Dict, Any
+from pydantic import ValidationError, ConfigDict
 from tavily import AsyncTavilyClient
 import logging
 from config.settings import settings
@@ -14,27 +14,9 @@ import asyncio
 from datetime import datetime, timedelta
 import re
 
-logger = logging.getLogger(__name__)
-
-
-class WebSearchResult(BaseModel):
-    """A single web search result."""
-    title: str = Field(description="Title of the search result")
-    url: str = Field(description="URL of the search result")
-    content: str = Field(description="Content snippet from the search result")
-    score: float = Field(ge=0.0, description="Relevance score")
-    published_date: Optional[str] = Field(description="Publication date if available")
+from .schemas import WebSearchResult, WebSearchResponse
 
-
-class WebSearchResponse(BaseModel):
-    """The structured response for a web search query."""
-    status: str = Field(default="success", description="Status of the search operation")
-    query: str = Field(description="Original search query")
-    enhanced_query: str = Field(description="Enhanced or modified query used for search")
-    results: List[WebSearchResult] = Field(description="List of search results")
-    total_results: int = Field(ge=0, description="Total number of results returned")
-    time_filter_applied: Optional[str] = Field(default=None, description="Time filter that was applied")
-    error: Optional[str] = Field(default=None, description="Error message if search failed")
+logger = logging.getLogger(__name__)
 
 
 class WebSearchTool(BaseTool):
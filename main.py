@@ -1,9 +1,10 @@
+import asyncio
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
@@ -12,8 +13,10 @@ from dotenv import load_dotenv
 from config.settings import settings
 from conversation.manager import ConversationManager
 from conversation.config import ConversationConfig
+from utils.http import close_openai_http_client, get_openai_http_client, warm_openai_http_client
 from utils.logging import setup_logging
 from workflow.graph import CybersecurityTeamGraph
+from workflow.quality_gates import start_score_worker, stop_score_worker
 from workflow.schemas import ChatResponse
 
 # --- Setup ---
@@ -26,13 +29,24 @@ class ChatRequest(BaseModel):
     message: str
     thread_id: str
 
+def _chat_json_response(chat_response: ChatResponse) -> Response:
+    """Encodes the response to JSON bytes in pydantic-core, skipping FastAPI's dict round-trip."""
+    return Response(content=chat_response.model_dump_json(), media_type="application/json")
+
 # --- Global State & Lifespan Management ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handles application startup and shutdown events."""
     logger.info("🚀 Initializing Cybersecurity Advisory System for API...")
     workflow = CybersecurityTeamGraph()
-    llm_client = ChatOpenAI(model=settings.default_model, temperature=0.1, max_tokens=4000)
+    llm_client = ChatOpenAI(
+        model=settings.default_model,
+        temperature=0.1,
+        max_tokens=4000,
+        http_async_client=get_openai_http_client()
+    )
+    # Runs alongside the rest of startup; every client shares the pool it warms
+    warmup_task = asyncio.create_task(warm_openai_http_client(llm_client))
     
     config = ConversationConfig.from_env()
     
@@ -42,9 +56,13 @@ async def lifespan(app: FastAPI):
         config=config
     )
     await app.state.conversation_manager.initialize()
+    start_score_worker()
+    await warmup_task
     logger.info("System initialized successfully for API")
     yield
     logger.info("Shutting down application")
+    await stop_score_worker()
+    await close_openai_http_client()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -73,18 +91,15 @@ async def chat_endpoint(request: Request):
         if len(team_responses) > 1:
             response_data["agent_name"] = "Advisory Team"
             response_data["agent_role"] = "team"
-            all_tools = []
-            for resp in team_responses:
-                if resp.tools_used:
-                    all_tools.extend([tool.tool_name for tool in resp.tools_used])
-            response_data["tools_used"] = sorted(list(set(all_tools)))
+            response_data["tools_used"] = sorted({tool.tool_name for resp in team_responses for tool in resp.tools_used})
             
         elif len(team_responses) == 1:
             first_responder = team_responses[0]
             response_data["agent_name"] = first_responder.agent_name
             response_data["agent_role"] = first_responder.agent_role.value
             if first_responder.tools_used:
-                response_data["tools_used"] = [tool.tool_name for tool in first_responder.tools_used]
+                # Deduplicate here so repeated calls to one tool don't trip ChatResponse's max_length
+                response_data["tools_used"] = list(dict.fromkeys(tool.tool_name for tool in first_responder.tools_used))
                 
         elif final_state.get("response_strategy") == "general_query":
             response_data["agent_name"] = "General Assistant"
@@ -101,16 +116,16 @@ async def chat_endpoint(request: Request):
         if team_responses:
             logger.info(f"Agent names: {[resp.agent_name for resp in team_responses]}")
             logger.info(f"Agent roles: {[resp.agent_role.value for resp in team_responses]}")
-        return ChatResponse(**response_data)
+        return _chat_json_response(ChatResponse(**response_data))
         
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}", exc_info=True)
-        return ChatResponse(
+        return _chat_json_response(ChatResponse(
             response="I apologize, but I encountered an error processing your request. Please try again.",
             agent_name="System",
             agent_role="error",
             tools_used=[]
-        )
+        ))
 
 # --- Static File Serving ---
 frontend_dir = Path(__file__).resolve().parent / "frontend"
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatcher:
+    """
+    Coalesces items submitted within a short window into one batched call.
+
+    Each caller awaits its own result. A batch is dispatched when it reaches
+    max_batch items or when max_wait_ms has passed since its first item.
+    With flush_when_idle, an item that arrives while no batch is running is dispatched
+    at once, so the wait window only applies under load, when there is work to coalesce.
+    If the batched call fails, every caller in that batch receives the exception.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 16,
+        max_wait_ms: float = 20,
+        max_concurrent_batches: int = 4,
+        flush_when_idle: bool = False,
+    ):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.flush_when_idle = flush_when_idle
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._semaphore = asyncio.Semaphore(max_concurrent_batches)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queues an item for the next batch and waits for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch or (self.flush_when_idle and not self._tasks):
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        async with self._semaphore:
+            try:
+                results = await self.process_batch([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"Batch returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                logger.warning(f"Batched call for {len(batch)} items failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
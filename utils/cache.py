@@ -0,0 +1,151 @@
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded in-process LRU cache with an optional per-entry time-to-live.
+
+    Operations are synchronous and never await, so callers on a single event loop
+    can share one instance without a lock.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None on a miss or an expired entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, stored_at = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Stores a value, evicting the least recently used entry when full."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    String key-value store in a local SQLite file, shared by every worker process on the host.
+
+    WAL mode lets readers run alongside a writer. Expiry uses wall-clock time so entries
+    written by one process are judged consistently by the others. Expired rows, and the
+    oldest rows beyond `max_entries`, are pruned on open and every PRUNE_INTERVAL writes.
+    """
+
+    PRUNE_INTERVAL = 256
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._writes_since_prune = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=1.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)")
+        self.prune()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the stored value, or None on a miss or an expired entry."""
+        row = self._conn.execute("SELECT value, stored_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        value, stored_at = row
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return None
+        return value
+
+    def set(self, key: str, value: str):
+        """Stores a value, replacing any previous entry for the key."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, stored_at) VALUES (?, ?, ?)", (key, value, time.time())
+        )
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= self.PRUNE_INTERVAL:
+            self.prune()
+
+    def prune(self):
+        """Deletes expired entries, then the oldest entries beyond max_entries."""
+        self._writes_since_prune = 0
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM cache WHERE stored_at < ?", (time.time() - self.ttl_seconds,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class PersistentLRUCache(LRUCache):
+    """
+    LRUCache that reads through to and writes through to a shared SQLiteCache.
+
+    Values are serialized with `encode`/`decode`. Persistent keys are hashed together with
+    `namespace`, so a model or prompt change starts from an empty cache instead of
+    serving stale decisions.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteCache,
+        namespace: str,
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+    ):
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.store = store
+        self.namespace = namespace
+        self.encode = encode
+        self.decode = decode
+
+    def _store_key(self, key: Hashable) -> str:
+        return hashlib.sha1(f"{self.namespace}\x00{key}".encode("utf-8")).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = super().get(key)
+        if value is not None:
+            return value
+
+        raw = self.store.get(self._store_key(key))
+        if raw is None:
+            return None
+        value = self.decode(raw)
+        super().set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        super().set(key, value)
+        self.store.set(self._store_key(key), self.encode(value))
@@ -0,0 +1,53 @@
+import importlib.util
+import logging
+from typing import Any, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 multiplexing is used when the optional `h2` package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_openai_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_openai_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide pooled HTTP client shared by every OpenAI client.
+
+    Router, agents, judges and tools all talk to the same API, so sharing one
+    keep-alive pool avoids a TCP+TLS handshake per concurrent call.
+    """
+    global _openai_http_client
+    if _openai_http_client is None or _openai_http_client.is_closed:
+        _openai_http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+        logger.info(f"Created shared OpenAI HTTP client (http2={HTTP2_AVAILABLE})")
+    return _openai_http_client
+
+
+async def warm_openai_http_client(llm: Any):
+    """
+    Opens a pooled connection to the API with a token-free model lookup, so the
+    first user request doesn't pay the TCP+TLS handshake. Failures are only logged.
+    """
+    client = getattr(llm, "root_async_client", None)
+    if client is None:
+        return
+    try:
+        await client.models.retrieve(llm.model_name)
+        logger.info("Warmed shared OpenAI HTTP client")
+    except Exception as e:
+        logger.warning(f"OpenAI connection warm-up failed: {e}")
+
+
+async def close_openai_http_client():
+    """Closes the shared OpenAI HTTP client; call once on application shutdown."""
+    global _openai_http_client
+    if _openai_http_client is not None and not _openai_http_client.is_closed:
+        await _openai_http_client.aclose()
+    _openai_http_client = None
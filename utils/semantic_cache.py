@@ -0,0 +1,88 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Bounded cache keyed by embedding similarity rather than exact text.
+
+    Embeddings are L2-normalized into a preallocated matrix, so a lookup is a single
+    matrix-vector product against every stored entry. When full, the oldest entry is
+    overwritten. Operations never await, so one instance can be shared on an event loop.
+    """
+
+    def __init__(self, max_entries: int = 512, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._matrix: Optional[np.ndarray] = None
+        self._values: List[Any] = [None] * max_entries
+        self._size = 0
+        self._next = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector) -> Optional[Any]:
+        """Returns the value of the most similar entry, or None if none reaches the threshold."""
+        if self._size == 0:
+            return None
+
+        scores = self._matrix[:self._size] @ self._normalize(vector)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        logger.debug(f"Semantic cache hit with similarity {scores[best]:.3f}")
+        return self._values[best]
+
+    def add(self, vector, value: Any):
+        """Stores a value under an embedding, replacing the oldest entry when full."""
+        if self.max_entries <= 0:
+            return
+        vector = self._normalize(vector)
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+        self._matrix[self._next] = vector
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class PrototypeClassifier:
+    """
+    Nearest-centroid classifier over embeddings of labelled example texts.
+
+    Each label's centroid is the normalized mean of its example embeddings. A prediction
+    returns the closest label and its margin over the runner-up, so callers can defer
+    to a stronger classifier when the margin is small.
+    """
+
+    def __init__(self, centroids: Dict[Any, np.ndarray]):
+        self.labels = list(centroids)
+        self._matrix = np.stack([SemanticCache._normalize(centroids[label]) for label in self.labels])
+
+    @classmethod
+    def from_examples(cls, embed_many: Callable[[List[str]], Iterable], examples: Dict[Any, List[str]]):
+        """Builds centroids by embedding every example text once."""
+        centroids = {}
+        for label, texts in examples.items():
+            vectors = np.stack([SemanticCache._normalize(vector) for vector in embed_many(texts)])
+            centroids[label] = vectors.mean(axis=0)
+        return cls(centroids)
+
+    def predict(self, vector) -> Tuple[Any, float]:
+        """Returns (label, margin) where margin is the similarity gap to the next-closest label."""
+        scores = self._matrix @ SemanticCache._normalize(vector)
+        order = np.argsort(scores)[::-1]
+        margin = float(scores[order[0]] - scores[order[1]]) if len(order) > 1 else 1.0
+        return self.labels[order[0]], margin
@@ -16,6 +16,7 @@ from workflow.schemas import ResponseStrategy
 from agents.factory import AgentFactory
 from langchain_openai import ChatOpenAI
 from config.settings import settings
+from utils.http import get_openai_http_client
 from cybersec_mcp.cybersec_tools import CybersecurityToolkit
 
 
@@ -38,7 +39,8 @@ class CybersecurityTeamGraph:
         llm_client = ChatOpenAI(
             model=settings.default_model,
             temperature=0.1,
-            max_tokens=4000
+            max_tokens=4000,
+            http_async_client=get_openai_http_client()
         )
 
         self.factory = AgentFactory(llm_client=llm_client)
@@ -3,6 +3,7 @@ Node functions for the workflow graph.
 Integrated with your existing QualityGateSystem.
 """
 
+import hashlib
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
@@ -17,13 +18,28 @@ from workflow.state import WorkflowState
 from workflow.schemas import TeamResponse, SearchIntentResult, ContextContinuityCheck
 from workflow.system_prompts import NodePrompts, SystemMessages, PromptFormatter
 from config.agent_config import AgentRole
+from config.settings import settings
 from agents.factory import AgentFactory
+from agents.base_agent import BaseSecurityAgent
 from cybersec_mcp.cybersec_tools import CybersecurityToolkit
 from cybersec_mcp.tools.web_search import WebSearchResponse
+from utils.cache import LRUCache
 
 
 logger = logging.getLogger(__name__)
 
+# Combined agent output below this size is joined as-is instead of being synthesized
+TRIVIAL_SYNTHESIS_CHARS = 512
+
+
+def _short(value, limit: int = 200) -> str:
+    """Truncate any message payload (str, bytes, structured tool output) for prompt summaries."""
+    if isinstance(value, bytes):
+        text = value.decode("utf-8", errors="replace")
+    else:
+        text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
 
 # =============================================================================
 # HELPER CLASSES FOR ORGANIZATION
@@ -44,6 +60,10 @@ class WebSearchIntentDetector:
     
     def __init__(self, llm_client):
         self.search_intent_llm = llm_client.with_structured_output(SearchIntentResult)
+        # Intent depends only on the query text, so repeated questions skip the LLM call
+        self._intent_cache = LRUCache(
+            max_entries=settings.routing_cache_size, ttl_seconds=settings.routing_cache_ttl_seconds
+        )
     
     async def detect_intent(self, query: str) -> WebSearchContext:
         """Detect web search intent with structured return"""
@@ -83,13 +103,17 @@ class WebSearchIntentDetector:
     
     async def _llm_analyze_intent(self, query: str) -> WebSearchContext:
         """Use LLM for complex intent analysis"""
-        llm_prompt = PromptFormatter.format_web_search_intent_prompt(query)
+        cache_key = " ".join(query.lower().split())
+        intent_result = self._intent_cache.get(cache_key)
         
         try:
-            intent_result = await self.search_intent_llm.ainvoke([
-                SystemMessage(content=SystemMessages.WEB_SEARCH_INTENT_EXPERT),
-                HumanMessage(content=llm_prompt)
-            ])
+            if intent_result is None:
+                intent_result = await self.search_intent_llm.ainvoke([
+                    SystemMessage(content=SystemMessages.WEB_SEARCH_INTENT_EXPERT),
+                    HumanMessage(content=PromptFormatter.format_web_search_intent_prompt(query))
+                ])
+                # Failed analyses fall through to the except below and are never cached
+                self._intent_cache.set(cache_key, intent_result)
             
             return WebSearchContext(
                 required=intent_result.needs_web_search,
@@ -125,8 +149,21 @@ class AgentConsultationHandler:
         
         web_context = await self._get_web_search_context(state)
         
+        # Bind per-request lookups once; every agent receives the same message list
+        agents_map = self.agents
+        team_responses = state["team_responses"]
+        messages = self._build_agent_messages(
+            state["query"],
+            web_context,
+            state.get("messages", [])
+        )
+        
         for agent_role in agents_to_consult:
-            await self._consult_single_agent(state, agent_role, web_context)
+            agent = agents_map.get(agent_role)
+            if not agent:
+                logger.error(f"Agent {agent_role} not found")
+                continue
+            await self._consult_single_agent(state, agent, agent_role, messages, team_responses)
         
         self._update_agent_persistence(state)
         
@@ -149,34 +186,24 @@ class AgentConsultationHandler:
     async def _consult_single_agent(
         self, 
         state: WorkflowState, 
+        agent: BaseSecurityAgent,
         agent_role: AgentRole, 
-        web_context: Optional[WebSearchContext]
+        messages: List,
+        team_responses: List[TeamResponse]
     ):
         """Consult a single agent with proper context injection"""
-        agent = self.agents.get(agent_role)
-        if not agent:
-            logger.error(f"Agent {agent_role} not found")
-            return
-        
         try:
             logger.info(f"Consulting {agent.name}")
             
-            messages = self._build_agent_messages(
-                state["query"],
-                web_context,
-                state.get("messages", [])
-            )
-            
             structured_response = await agent.respond(messages=messages)
             
-            team_response = TeamResponse(
+            team_response = TeamResponse.from_agent_response(
                 agent_name=agent.name,
                 agent_role=agent_role,
-                response=structured_response,
-                tools_used=structured_response.tools_used,
+                response=structured_response
             )
             
-            state["team_responses"].append(team_response)
+            team_responses.append(team_response)
             
             logger.info(f"{agent.name} completed (confidence: {structured_response.confidence_score:.2f})")
             
@@ -271,7 +298,7 @@ class WorkflowNodes:
 Result {i}:
 Title: {result.title}
 URL: {result.url}
-Content: {result.content[:300]}{'...' if len(result.content) > 300 else ''}
+Content: {_short(result.content, 300)}
 """)
         
         return f"""
@@ -342,7 +369,7 @@ Please use this information to provide an accurate and helpful response to the u
             
             context_prompt = PromptFormatter.format_context_continuity_prompt(
                 current_query=state['query'],
-                conversation_history=chr(10).join([f"- {msg.role}: {msg.content[:200]}..." for msg in recent_messages])
+                conversation_history=chr(10).join([f"- {msg.role}: {_short(msg.content)}" for msg in recent_messages])
             )
             
             try:
@@ -545,7 +572,7 @@ Please use this information to provide an accurate and helpful response to the u
         
         try:
             # Handle direct cybersecurity response with router tools
-            final_answer = await self.router.direct_response(state["query"])
+            final_answer = await self.router.direct_response_collected(state["query"])
             
             state["final_answer"] = final_answer
             
@@ -579,9 +606,11 @@ Please use this information to provide an accurate and helpful response to the u
             state["final_answer"] = "I couldn't gather expert analysis for your query."
             return state
         
-        if len(state["team_responses"]) == 1:
+        team_responses = self._deduplicate_responses(state["team_responses"])
+
+        if len(team_responses) == 1:
             # For single agent response, handle unified response format
-            agent_response = state["team_responses"][0]
+            agent_response = team_responses[0]
             response_content = agent_response.response
             
             # Use content if available (natural response), otherwise use summary (structured response)
@@ -606,23 +635,49 @@ Please use this information to provide an accurate and helpful response to the u
             state["final_answer"] = final_answer
         
         else:
+            response_texts = [
+                (resp.agent_name.split(' (')[0], resp.response.content or resp.response.summary or "")
+                for resp in team_responses
+            ]
+            total_chars = sum(len(text) for _, text in response_texts)
+
             # For multiple agents, decide between formal coordination vs simple synthesis
-            if state.get("needs_consensus", False) or len(state["team_responses"]) > 2:
+            if total_chars < TRIVIAL_SYNTHESIS_CHARS:
+                # Tiny team outputs don't warrant a coordinator call or the summary template
+                final_answer = "\n\n".join(f"**{name}**: {text}" for name, text in response_texts)
+            elif state.get("needs_consensus", False) or len(team_responses) > 2:
                 # Use formal coordination format for complex multi-agent responses
-                final_answer = await self._create_executive_summary(state["team_responses"], state["query"])
+                final_answer = await self._create_executive_summary(team_responses, state["query"])
             else:
                 # Use existing simple synthesis logic
-                final_answer = self._create_simple_synthesis(state["team_responses"])
+                final_answer = self._create_simple_synthesis(team_responses)
 
             state["final_answer"] = final_answer
         
         state["messages"].append(AIMessage(content=state["final_answer"]))
         state["completed_at"] = datetime.now(timezone.utc)
         
-        logger.info(f"Synthesized response from {len(state['team_responses'])} agents")
+        logger.info(f"Synthesized response from {len(team_responses)} agents")
     
         return state
     
+    def _deduplicate_responses(self, team_responses: List[TeamResponse]) -> List[TeamResponse]:
+        """
+        Collapse agent responses with identical content, keeping the most confident copy.
+        Overlapping experts sometimes return the same answer; it should only be rendered once.
+        """
+        unique_responses: Dict[bytes, TeamResponse] = {}
+        for resp in team_responses:
+            text = resp.response.content or resp.response.summary or ""
+            fingerprint = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+            kept = unique_responses.get(fingerprint)
+            if kept is None or kept.response.confidence_score < resp.response.confidence_score:
+                unique_responses[fingerprint] = resp
+
+        if len(unique_responses) < len(team_responses):
+            logger.info(f"Dropped {len(team_responses) - len(unique_responses)} duplicate agent responses before synthesis")
+        return list(unique_responses.values())
+
     async def _create_executive_summary(self, team_responses: List, query: str) -> str:
         """
         Create a formal executive summary using the coordinator agent.
@@ -634,6 +689,7 @@ Please use this information to provide an accurate and helpful response to the u
             # Handle unified response format
             summary = resp.response.summary if resp.response.summary else resp.response.content
             recommendations = resp.response.recommendations if resp.response.recommendations else []
+            recommendation_items = "\n    ".join(f"<item>{rec}</item>" for rec in recommendations)
             
             analysis = f"""
 <expert_analysis>
@@ -641,7 +697,7 @@ Please use this information to provide an accurate and helpful response to the u
   <agent_role>{resp.agent_role.value}</agent_role>
   <summary>{summary}</summary>
   <recommendations>
-    {'\\n'.join(f"<item>{rec}</item>" for rec in recommendations)}
+    {recommendation_items}
   </recommendations>
 </expert_analysis>
 """
@@ -805,7 +861,7 @@ Please use this information to provide an accurate and helpful response to the u
             logger.info(f"Quality check failed (score: {quality_result.overall_score:.2f} < {quality_threshold}), enhancing response...")
             state["quality_passed"] = False # Explicitly mark as failed before enhancement
             
-            enhanced_response = await self.quality_system.enhance_response(
+            enhanced_response = await self.quality_system.enhance_response_collected(
                 query=state["query"],
                 response=state["final_answer"],
                 feedback=quality_result.feedback,
@@ -875,15 +931,10 @@ Please use this information to provide an accurate and helpful response to the u
         if not context_chunks:
             return state  # No RAG to check
         
-        # Check groundedness
-        groundedness_result = await self.quality_system.check_groundedness(
-            answer=state["final_answer"],
-            context_chunks=context_chunks
-        )
-        
-        # Check relevance
-        relevance_result = await self.quality_system.check_relevance(
+        # Check groundedness and relevance concurrently
+        groundedness_result, relevance_result = await self.quality_system.run_rag_gates(
             query=state["query"],
+            answer=state["final_answer"],
             context_chunks=context_chunks
         )
         
@@ -1,12 +1,35 @@
+import asyncio
+import copy
+import functools
+import hashlib
+import json
 import logging
-from typing import List
+import random
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from langfuse import observe, get_client
-from pydantic import ValidationError
+from langchain_core.runnables import RunnableLambda
+from langfuse import observe
+from openai import APIConnectionError, APITimeoutError, RateLimitError
+from pydantic import BaseModel, ValidationError
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
-from config.langfuse_settings import langfuse_config
-from workflow.schemas import QualityGateResult, RAGRelevanceResult, RAGGroundednessResult
+from config.langfuse_settings import get_langfuse_client, langfuse_config
+from config.settings import settings
+from utils.cache import LRUCache
+from utils.http import get_openai_http_client
+from workflow.schemas import (
+    QualityGateResult,
+    RAGRelevanceResult,
+    RAGGroundednessResult,
+)
 from config.evaluation_prompts import (
     EVALUATOR_SYSTEM_PERSONA,
     GROUNDEDNESS_SYSTEM_PERSONA,
@@ -15,12 +38,180 @@ from config.evaluation_prompts import (
     VALIDATE_RESPONSE_PROMPT,
     ENHANCE_RESPONSE_PROMPT,
     CHECK_GROUNDEDNESS_PROMPT,
+    CHECK_GROUNDEDNESS_FAST_PROMPT,
     CHECK_RELEVANCE_PROMPT,
     AGENT_ROLE_CONTEXTS,
 )
 
 logger = logging.getLogger(__name__)
 
+JudgeResult = TypeVar("JudgeResult", bound=BaseModel)
+
+# Separator between retrieved chunks, and a rough chars-per-token ratio for budgeting
+# context without a tokenizer dependency.
+CONTEXT_SEPARATOR = "\n---\n"
+CHARS_PER_TOKEN = 4
+
+# Responses that are always judged regardless of the sample rate: short answers are
+# the ones most likely to be errors, and compliance has the strictest threshold.
+SAMPLING_MIN_RESPONSE_CHARS = 200
+ALWAYS_EVALUATED_AGENT_TYPES = frozenset({"compliance"})
+
+# Caps in-flight judge calls so bursts queue locally instead of tripping provider rate limits.
+# One semaphore per event loop: a semaphore binds to the loop that first waits on it, and
+# scripts may run several loops (repeated asyncio.run) in one process.
+_judge_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _judge_concurrency() -> asyncio.Semaphore:
+    """Returns the judge concurrency limit for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    semaphore = _judge_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _judge_semaphores[loop] = asyncio.Semaphore(settings.judge_max_concurrency)
+    return semaphore
+
+# Scores are queued here and sent in batches by one background worker, so quality gates
+# return as soon as their verdict is parsed instead of waiting on Langfuse.
+# The queue is created with the worker, on the loop that runs it, rather than at import.
+_score_queue: "Optional[asyncio.Queue[Tuple[Any, Dict[str, Any]]]]" = None
+SCORE_FLUSH_INTERVAL = 0.5
+_score_worker_task: Optional[asyncio.Task] = None
+
+
+def _send_scores(batch: List[Tuple[Any, Dict[str, Any]]]):
+    """Sends a batch of scores and flushes each Langfuse client involved."""
+    clients = []
+    for client, payload in batch:
+        try:
+            client.create_score(**payload)
+        except Exception as e:
+            logger.warning(f"Failed to send quality score '{payload['name']}' to Langfuse: {e}")
+        if client not in clients:
+            clients.append(client)
+    for client in clients:
+        try:
+            client.flush()
+        except Exception as e:
+            logger.warning(f"Failed to flush Langfuse scores: {e}")
+
+
+def _drain_score_queue() -> List[Tuple[Any, Dict[str, Any]]]:
+    """Takes everything currently waiting in the score queue."""
+    batch = []
+    if _score_queue is None:
+        return batch
+    while True:
+        try:
+            batch.append(_score_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            return batch
+        _score_queue.task_done()
+
+
+async def _score_worker():
+    """Background loop that forwards queued scores to Langfuse every flush interval."""
+    while True:
+        await asyncio.sleep(SCORE_FLUSH_INTERVAL)
+        batch = _drain_score_queue()
+        if batch:
+            await asyncio.to_thread(_send_scores, batch)
+
+
+def start_score_worker():
+    """Starts the score worker and its queue on the running loop if it isn't already running."""
+    global _score_queue, _score_worker_task
+    if _score_queue is None:
+        _score_queue = asyncio.Queue()
+    if _score_worker_task is None or _score_worker_task.done():
+        _score_worker_task = asyncio.create_task(_score_worker())
+
+
+async def stop_score_worker():
+    """Stops the score worker and sends whatever is still queued."""
+    global _score_queue, _score_worker_task
+    if _score_worker_task is not None:
+        _score_worker_task.cancel()
+        try:
+            await _score_worker_task
+        except asyncio.CancelledError:
+            pass
+        _score_worker_task = None
+    batch = _drain_score_queue()
+    _score_queue = None
+    if batch:
+        await asyncio.to_thread(_send_scores, batch)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_evaluator_config(agent_type: str) -> Dict[str, Any]:
+    """Builds the evaluator config once per agent type; it only changes on restart."""
+    return langfuse_config.create_agent_evaluator(agent_type)
+
+
+def _evaluator_config(agent_type: str) -> Dict[str, Any]:
+    """Returns a shallow copy of the cached evaluator config for an agent type."""
+    return copy.copy(_cached_evaluator_config(agent_type))
+
+
+@retry(
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(5),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+async def _ainvoke_with_backoff(runnable, messages: List[Any]) -> Any:
+    """Invokes a judge runnable, backing off with jitter on rate limits and timeouts."""
+    async with _judge_concurrency():
+        return await runnable.ainvoke(messages)
+
+
+def _parse_groundedness_json(message: Any) -> Dict[str, Any]:
+    """Parses a JSON-mode groundedness reply into the same shape as include_raw structured output."""
+    try:
+        parsed = RAGGroundednessResult.model_validate(json.loads(message.content))
+        return {"raw": message, "parsed": parsed, "parsing_error": None}
+    except (ValueError, ValidationError) as e:
+        return {"raw": message, "parsed": None, "parsing_error": e}
+
+
+def _pack_context(chunks: List[str], max_tokens: int = 3000) -> str:
+    """
+    Joins retrieved chunks in order until the estimated token budget is spent.
+    The chunk that crosses the budget is cut to fit; anything after it is dropped.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    packed = []
+    for chunk in chunks:
+        if budget <= 0:
+            break
+        if len(chunk) > budget:
+            packed.append(chunk[:budget])
+            break
+        packed.append(chunk)
+        budget -= len(chunk) + len(CONTEXT_SEPARATOR)
+
+    if len(packed) < len(chunks):
+        logger.debug(f"Packed {len(packed)}/{len(chunks)} context chunks into a {max_tokens}-token budget")
+    return CONTEXT_SEPARATOR.join(packed)
+
+
+class JudgeCache(LRUCache):
+    """
+    Bounded in-process LRU of judge verdicts, stored as JSON.
+    Keys hash the exact model, persona, prompt and result schema, so a hit is only
+    returned for a byte-identical evaluation request.
+    """
+
+    @staticmethod
+    def make_key(model_name: str, persona: str, prompt: str, schema_name: str) -> str:
+        """Builds the cache key for a single judge request."""
+        raw = "\x1f".join((model_name, persona, prompt, schema_name))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 
 class QualityGateSystem:
     """
@@ -29,31 +220,195 @@ class QualityGateSystem:
     RAG groundedness, and RAG relevance, using structured outputs.
     """
 
-    def __init__(self, llm_client: ChatOpenAI):
-        """Initializes the Quality Gate System with LangChain structured outputs."""
+    def __init__(self, llm_client: ChatOpenAI, judge_llm: Optional[ChatOpenAI] = None):
+        """
+        Initializes the Quality Gate System with LangChain structured outputs.
+
+        Args:
+            llm_client: The capable model used to rewrite responses in enhance_response.
+            judge_llm: The model used for scoring judges; defaults to settings.judge_model_name.
+        """
         self.evaluator_llm = llm_client
-        self.langfuse = langfuse_config.client if langfuse_config.client else get_client()
+        self.judge_llm = judge_llm or ChatOpenAI(
+            model=settings.judge_model_name,
+            temperature=0,
+            http_async_client=get_openai_http_client()
+        )
+        # Resolved once; None when Langfuse is offline, which disables scoring and the judges
+        self.langfuse = get_langfuse_client()
         
-        # These runnables now handle parsing and retries internally
-        self.quality_llm = self.evaluator_llm.with_structured_output(QualityGateResult)
-        self.groundedness_llm = self.evaluator_llm.with_structured_output(RAGGroundednessResult)
-        self.relevance_llm = self.evaluator_llm.with_structured_output(RAGRelevanceResult)
+        # Scoring is simple classification, so the judges run on the cheaper judge model.
+        # These runnables handle parsing and retries internally; include_raw keeps the
+        # AIMessage so prompt-cache usage can be reported.
+        self.quality_llm = self.judge_llm.with_structured_output(QualityGateResult, include_raw=True)
+        self.groundedness_llm = self.judge_llm.with_structured_output(RAGGroundednessResult, include_raw=True)
+        self.relevance_llm = self.judge_llm.with_structured_output(RAGRelevanceResult, include_raw=True)
+        # Groundedness is a binary verdict, so plain JSON mode with a terse prompt is enough
+        self._groundedness_fast_llm = self.judge_llm.bind(
+            response_format={"type": "json_object"}
+        ) | RunnableLambda(_parse_groundedness_json)
+
+        # Personas never change, so their system messages are built once and reused
+        self._evaluator_system = SystemMessage(content=EVALUATOR_SYSTEM_PERSONA)
+        self._groundedness_system = SystemMessage(content=GROUNDEDNESS_SYSTEM_PERSONA)
+        self._relevance_system = SystemMessage(content=RELEVANCE_SYSTEM_PERSONA)
+        self._enhancer_system = SystemMessage(content=ENHANCER_SYSTEM_PERSONA)
+
+        # Judges are pure functions of their prompt, so identical requests reuse the verdict
+        self.judge_cache = JudgeCache(max_entries=settings.judge_cache_size)
+        self._judge_model_name = getattr(self.judge_llm, "model_name", "")
+        # Identical judge calls already in flight, keyed like the cache; concurrent callers share one
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _score(self, name: str, value: float, comment: Optional[str] = None):
+        """Queues a score for the current span; the Langfuse call happens off the request path."""
+        if not self.langfuse:
+            return
 
+        # Capture the span identity now - the worker runs outside the observed context
+        payload = {
+            "name": name,
+            "value": value,
+            "comment": comment,
+            "trace_id": self.langfuse.get_current_trace_id(),
+            "observation_id": self.langfuse.get_current_observation_id(),
+        }
+
+        # The app starts the worker at boot; this covers scripts that never do
+        start_score_worker()
+        _score_queue.put_nowait((self.langfuse, payload))
+
+    def _should_sample(self, response: str, agent_type: str) -> bool:
+        """Head-based sampling decision for whether a response gets an LLM judge call."""
+        if settings.quality_gate_sample_rate >= 1.0:
+            return True
+        if len(response.strip()) < SAMPLING_MIN_RESPONSE_CHARS:
+            return True
+        if agent_type in ALWAYS_EVALUATED_AGENT_TYPES:
+            return True
+        return random.random() < settings.quality_gate_sample_rate
+
+    async def _invoke_judge(
+        self, runnable, system_message: SystemMessage, prompt: str, result_type: Type[JudgeResult]
+    ) -> JudgeResult:
+        """
+        Runs a structured judge call, answering repeated prompts from the verdict cache and
+        coalescing concurrent identical prompts into a single LLM call.
+        """
+        key = JudgeCache.make_key(
+            self._judge_model_name, system_message.content, prompt, result_type.__name__
+        )
+        cached = self.judge_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Judge cache hit for {result_type.__name__}")
+            return result_type.model_validate_json(cached)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.debug(f"Joining in-flight judge call for {result_type.__name__}")
+        else:
+            # The call runs as its own task so cancelling whichever caller started it
+            # doesn't cancel it for the others waiting on the same prompt
+            task = asyncio.ensure_future(
+                self._run_judge(runnable, system_message, prompt, result_type, key)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_inflight(key, done))
+        return result_type.model_validate_json(await asyncio.shield(task))
+
+    async def _run_judge(
+        self, runnable, system_message: SystemMessage, prompt: str, result_type: Type[JudgeResult], key: str
+    ) -> str:
+        """Makes the judge LLM call and caches the verdict, returning it as JSON."""
+        output = await _ainvoke_with_backoff(runnable, [system_message, HumanMessage(content=prompt)])
+        if output.get("parsing_error"):
+            raise output["parsing_error"]
+
+        payload = output["parsed"].model_dump_json()
+        self._record_prompt_cache_usage(output.get("raw"), result_type.__name__)
+        self.judge_cache.set(key, payload)
+        return payload
+
+    def _finish_inflight(self, key: str, task: asyncio.Future) -> None:
+        """Drops a finished judge task from the in-flight map."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved so a call whose callers all went away doesn't log a warning
+        if not task.cancelled():
+            task.exception()
+
+    async def _ainvoke_judge(
+        self,
+        runnable,
+        system_message: SystemMessage,
+        prompt: str,
+        result_type: Type[JudgeResult],
+        score_name: str,
+        extract_score: Callable[[JudgeResult], float],
+        fallback: Callable[[Exception], JudgeResult]
+    ) -> JudgeResult:
+        """
+        Runs a judge and records its score, or logs the failure, records `<score_name>_error`
+        and returns the fail-safe result built by `fallback`.
+        """
+        try:
+            result = await self._invoke_judge(runnable, system_message, prompt, result_type)
+            self._score(name=score_name, value=extract_score(result), comment=result.feedback)
+            return result
+        except (ValidationError, Exception) as e:
+            logger.error(f"Error during {score_name} check: {e}")
+            self._score(name=f"{score_name}_error", value=1, comment=str(e))
+            return fallback(e)
+
+    def _record_prompt_cache_usage(self, raw_message: Any, judge_name: str):
+        """Reports how many prompt tokens the provider served from its prefix cache."""
+        usage = getattr(raw_message, "usage_metadata", None) or {}
+        cache_read_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        input_tokens = usage.get("input_tokens", 0)
+        logger.debug(f"{judge_name} prompt cache: {cache_read_tokens}/{input_tokens} input tokens cached")
+        if not self.langfuse:
+            return
+
+        # Telemetry, not a quality signal, so it goes on the span rather than the score stream
+        try:
+            self.langfuse.update_current_span(metadata={
+                "judge": judge_name,
+                "cache_read_tokens": cache_read_tokens,
+                "input_tokens": input_tokens,
+            })
+        except Exception as e:
+            logger.debug(f"Could not attach prompt cache usage to the span: {e}")
 
     @observe()
     async def validate_response(
-        self, query: str, response: str, agent_type: str, context_info: dict = None, fail_open: bool = True
+        self,
+        query: str,
+        response: str,
+        agent_type: str,
+        context_info: dict = None,
+        fail_open: bool = True,
+        force: bool = False
     ) -> QualityGateResult:
-        """Validates an agent's response using a detailed, LLM-based evaluation."""
-        langfuse = get_client()
-        
+        """
+        Validates an agent's response using a detailed, LLM-based evaluation.
+        Only a sampled fraction of responses is judged unless force is set; see _should_sample.
+        """
         # Log the exact input being sent to the quality gate for debugging
         logger.info(f"--- Validating Response for Quality ---\nQuery: {query}\nResponse: {response}\nAgent Type: {agent_type}\n------------------------------------")
         
         if not self.langfuse:
             return QualityGateResult(passed=True, overall_score=10.0, feedback="Langfuse offline.")
 
-        evaluator_config = langfuse_config.create_agent_evaluator(agent_type)
+        if not force and not self._should_sample(response, agent_type):
+            logger.info(f"Quality gate skipped by sampling for {agent_type}")
+            # Sampling is telemetry, not a quality signal, so it goes on the span rather than the score stream
+            try:
+                self.langfuse.update_current_span(metadata={"quality_gate_sampled_skip": True})
+            except Exception as e:
+                logger.debug(f"Could not attach sampling decision to the span: {e}")
+            return QualityGateResult(passed=True, overall_score=8.0, feedback="sampled-skip")
+
+        evaluator_config = _evaluator_config(agent_type)
         
         # Add context information to the evaluation if available
         context_context = ""
@@ -75,11 +430,9 @@ class QualityGateSystem:
         
         try:
             # The with_structured_output runnable handles parsing and retries.
-            evaluation_message = [
-                SystemMessage(content=EVALUATOR_SYSTEM_PERSONA),
-                HumanMessage(content=evaluation_prompt)
-            ]
-            result = await self.quality_llm.ainvoke(evaluation_message)
+            result = await self._invoke_judge(
+                self.quality_llm, self._evaluator_system, evaluation_prompt, QualityGateResult
+            )
 
             # Log the evaluation results including scores
             logger.info(f"--- Quality Evaluation Results ---")
@@ -99,29 +452,28 @@ class QualityGateSystem:
             logger.info(f"Feedback: {result.feedback}")
             logger.info(f"------------------------------------")
 
-            langfuse.score_current_span(
+            self._score(
                 name=f"{agent_type}_quality_score",
                 value=result.overall_score,
                 comment=result.feedback
             )
-            langfuse.score_current_span(name="quality_gate_succeeded", value=1)
+            self._score(name="quality_gate_succeeded", value=1)
             return result
 
         except Exception as e:
             logging.error(f"Error during quality validation for {agent_type}: {e}")
-            langfuse.score_current_span(name="quality_gate_execution_error", value=1, comment=str(e))
-            langfuse.score_current_span(name="quality_gate_succeeded", value=0)
+            self._score(name="quality_gate_execution_error", value=1, comment=str(e))
+            self._score(name="quality_gate_succeeded", value=0)
             return QualityGateResult(
                 passed=fail_open,
                 overall_score=0.0,
                 feedback=f"Quality evaluation could not be performed: {str(e)[:200]}"
             )
 
-    @observe()
-    async def enhance_response(self, query: str, response: str, feedback: str, agent_type: str) -> str:
-        """Improves a response that failed the quality gate, based on specific feedback."""
-        langfuse = get_client()
-        
+    def _build_enhancement_messages(
+        self, query: str, response: str, feedback: str, agent_type: str
+    ) -> List[Any]:
+        """Builds the enhancer prompt for a response that failed the quality gate."""
         # ---> FIX: Build the role_context required by the enhancement prompt <---
         role_context = AGENT_ROLE_CONTEXTS.get(agent_type, "No specific role context found.")
 
@@ -132,69 +484,103 @@ class QualityGateSystem:
             agent_type=agent_type,
             role_context=role_context
         )
-        
+        return [self._enhancer_system, HumanMessage(content=enhancement_prompt)]
+
+    @observe(name="enhance_response_stream")
+    async def enhance_response(
+        self, query: str, response: str, feedback: str, agent_type: str
+    ) -> AsyncIterator[str]:
+        """
+        Streams an improved version of a response that failed the quality gate.
+        If the enhancer fails before producing any text, the original response is yielded instead.
+        """
+        messages = self._build_enhancement_messages(query, response, feedback, agent_type)
+        streamed_any = False
         try:
-            enhanced_response = await self.evaluator_llm.ainvoke([
-                SystemMessage(content=ENHANCER_SYSTEM_PERSONA),
-                HumanMessage(content=enhancement_prompt)
-            ])
-            enhanced_content = enhanced_response.content
-            langfuse.score_current_span(name="response_enhancement_successful", value=1.0, comment="Response was successfully enhanced.")
-            return enhanced_content
-        
+            async for chunk in self.evaluator_llm.astream(messages):
+                if chunk.content:
+                    streamed_any = True
+                    yield chunk.content
+            self._score(name="response_enhancement_successful", value=1.0, comment="Response was successfully enhanced.")
+
         except Exception as e:
             logging.error(f"Error during response enhancement: {e}")
-            langfuse.score_current_span(name="response_enhancement_failed", value=0.0, comment=f"Response enhancement failed: {e}")
-            return response
+            self._score(name="response_enhancement_failed", value=0.0, comment=f"Response enhancement failed: {e}")
+            if not streamed_any:
+                yield response
+
+    @observe(name="enhance_response")
+    async def enhance_response_collected(
+        self, query: str, response: str, feedback: str, agent_type: str
+    ) -> str:
+        """Collects the streamed enhancement into a single string."""
+        return "".join([part async for part in self.enhance_response(query, response, feedback, agent_type)])
 
     @observe()
     async def check_groundedness(self, answer: str, context_chunks: List[str]) -> RAGGroundednessResult:
         """Checks if the answer is factually supported by the retrieved context (RAG)."""
-        langfuse = get_client()
-        
-        full_context = "\\n---\\n".join(context_chunks)
+        full_context = _pack_context(context_chunks, settings.judge_context_max_tokens)
+
+        if settings.groundedness_fast_path:
+            try:
+                result = await self._invoke_judge(
+                    self._groundedness_fast_llm,
+                    self._groundedness_system,
+                    CHECK_GROUNDEDNESS_FAST_PROMPT.format(context=full_context, answer=answer),
+                    RAGGroundednessResult
+                )
+                self._score(name="rag_groundedness", value=1 if result.grounded else 0, comment=result.feedback)
+                return result
+            except Exception as e:
+                logger.warning(f"Fast groundedness check failed, using the full judge: {e}")
+
         prompt = CHECK_GROUNDEDNESS_PROMPT.format(context=full_context, answer=answer)
-        
-        try:
-            message = [
-                SystemMessage(content=GROUNDEDNESS_SYSTEM_PERSONA),
-                HumanMessage(content=prompt)
-            ]
-            result = await self.groundedness_llm.ainvoke(message)
-            
-            langfuse.score_current_span(
-                name="rag_groundedness",
-                value=1 if result.grounded else 0,
-                comment=result.feedback
-            )
-            return result
-        except (ValidationError, Exception) as e:
-            logging.error(f"Error during groundedness check: {e}")
-            langfuse.score_current_span(name="rag_groundedness_error", value=1, comment=str(e))
-            return RAGGroundednessResult(grounded=False, feedback=f"Evaluation failed: {e}")
+        return await self._ainvoke_judge(
+            self.groundedness_llm,
+            self._groundedness_system,
+            prompt,
+            RAGGroundednessResult,
+            score_name="rag_groundedness",
+            extract_score=lambda result: 1 if result.grounded else 0,
+            fallback=lambda e: RAGGroundednessResult(grounded=False, feedback=f"Evaluation failed: {e}")
+        )
 
     @observe()
     async def check_relevance(self, query: str, context_chunks: List[str]) -> RAGRelevanceResult:
         """Checks if the retrieved context chunks are relevant to the user's query (RAG)."""
-        langfuse = get_client()
-        
-        full_context = "\\n---\\n".join(context_chunks)
+        full_context = _pack_context(context_chunks, settings.judge_context_max_tokens)
         prompt = CHECK_RELEVANCE_PROMPT.format(context=full_context, query=query)
         
-        try:
-            message = [
-                SystemMessage(content=RELEVANCE_SYSTEM_PERSONA),
-                HumanMessage(content=prompt)
-            ]
-            result = await self.relevance_llm.ainvoke(message)
-            
-            langfuse.score_current_span(
-                name="rag_relevance",
-                value=result.score,
-                comment=result.feedback
-            )
-            return result
-        except (ValidationError, Exception) as e:
-            logging.error(f"Error during relevance check: {e}")
-            langfuse.score_current_span(name="rag_relevance_error", value=1, comment=str(e))
-            return RAGRelevanceResult(score=0.0, is_relevant=False, feedback=f"Evaluation failed: {e}")
\ No newline at end of file
+        return await self._ainvoke_judge(
+            self.relevance_llm,
+            self._relevance_system,
+            prompt,
+            RAGRelevanceResult,
+            score_name="rag_relevance",
+            extract_score=lambda result: result.score,
+            fallback=lambda e: RAGRelevanceResult(score=0.0, is_relevant=False, feedback=f"Evaluation failed: {e}")
+        )
+
+    async def run_rag_gates(
+        self, query: str, answer: str, context_chunks: List[str]
+    ) -> Tuple[RAGGroundednessResult, RAGRelevanceResult]:
+        """
+        Runs the groundedness and relevance judges concurrently.
+        Both read the same inputs and are independent LLM round-trips, so latency is
+        the slower of the two rather than their sum.
+        """
+        groundedness, relevance = await asyncio.gather(
+            self.check_groundedness(answer=answer, context_chunks=context_chunks),
+            self.check_relevance(query=query, context_chunks=context_chunks),
+            return_exceptions=True,
+        )
+
+        # Each judge already fails safe internally; this covers anything raised around it
+        if isinstance(groundedness, BaseException):
+            logger.error(f"Groundedness gate raised: {groundedness}")
+            groundedness = RAGGroundednessResult(grounded=False, feedback=f"Evaluation failed: {groundedness}")
+        if isinstance(relevance, BaseException):
+            logger.error(f"Relevance gate raised: {relevance}")
+            relevance = RAGRelevanceResult(score=0.0, is_relevant=False, feedback=f"Evaluation failed: {relevance}")
+
+        return groundedness, relevance
@@ -3,32 +3,301 @@ Query router for determining which agents should handle a query.
 Uses LangChain's with_structured_output for reliable outputs with retries.
 """
 
+import asyncio
+import functools
+import hashlib
+import json
 import logging
-from typing import List, Optional
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastembed import TextEmbedding
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
 from pydantic import ValidationError
 from langfuse import observe
-from dataclasses import dataclass
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from tenacity import (
+    AsyncRetrying,
+    before_sleep_log,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+from dataclasses import dataclass, field
 
 from config.agent_config import AgentRole, INTERACTION_RULES, AGENT_TOOL_PERMISSIONS, TOOL_DEFINITIONS
-from workflow.schemas import RoutingDecision, CybersecurityClassification, ResponseStrategy
+from config.settings import settings
+from workflow.schemas import (
+    BatchCybersecurityClassification,
+    ComplexityLevel,
+    CybersecurityClassification,
+    ResponseStrategy,
+    RoutingDecision,
+    TriageDecision,
+)
 
 from cybersec_mcp.cybersec_tools import CybersecurityToolkit
+from utils.batching import AsyncBatcher
+from utils.cache import LRUCache, PersistentLRUCache, SQLiteCache
+from utils.http import get_openai_http_client
+from utils.semantic_cache import PrototypeClassifier, SemanticCache
 
 logger = logging.getLogger(__name__)
 
+# Unambiguous domain vocabulary used to route obvious queries without an LLM call.
+# A query short-circuits only when exactly one role matches, with at least
+# KEYWORD_ROUTING_MIN_HITS distinct keyword hits. Words with everyday meanings
+# ("contain", "audit", "campaign", "apt") only count inside security phrases.
+KEYWORD_ROUTING_PATTERNS = {
+    AgentRole.INCIDENT_RESPONSE: re.compile(
+        r"\b(breach(?:ed)?|ransomware|infect(?:ed|ion)|compromised|hacked|incident|"
+        r"exfiltrat(?:ed|ion)|contain(?:ing)? the (?:breach|incident|attack|infection)|forensics?|"
+        r"suspicious (?:login|activity|process))\b",
+        re.IGNORECASE
+    ),
+    AgentRole.PREVENTION: re.compile(
+        r"\b(firewall|hardening|harden|patch(?:ing)?|zero trust|mfa|network segmentation|"
+        r"vulnerability management|security architecture|security controls?|least privilege)\b",
+        re.IGNORECASE
+    ),
+    AgentRole.THREAT_INTEL: re.compile(
+        r"\b(threat actors?|apt ?\d+|apt groups?|ttps?|(?:attack|phishing|malware) campaigns?|"
+        r"threat attribution|mitre|att&ck|"
+        r"threat intelligence|threat landscape|iocs?)\b",
+        re.IGNORECASE
+    ),
+    AgentRole.COMPLIANCE: re.compile(
+        r"\b(gdpr|hipaa|pci[- ]?dss|sox compliance|(?:security|compliance) audits?|compliance|"
+        r"iso 27001|data protection officer|dpia)\b",
+        re.IGNORECASE
+    ),
+}
+KEYWORD_ROUTING_MIN_HITS = 2
+# Definition-style questions ("what is ransomware?") are left to triage, which can answer
+# them directly instead of sending them to a specialist
+_DEFINITION_QUERY_PATTERN = re.compile(
+    r"^\W*(?:(?:can|could) you |please )?(?:what(?:'s| is| are)|explain|define|describe|meaning of)\b",
+    re.IGNORECASE
+)
 
-@dataclass
+# All role vocabularies merged into one alternation with a named group per role, so a
+# query is scanned once and each hit reports its role via match.lastgroup
+_KEYWORD_ROUTING_SCANNER = re.compile(
+    "|".join(f"(?P<{role.value}>{pattern.pattern})" for role, pattern in KEYWORD_ROUTING_PATTERNS.items()),
+    re.IGNORECASE
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _keyword_route(query: str) -> Optional[AgentRole]:
+    """Returns the single role a query unambiguously belongs to, or None to defer to the LLM."""
+    if _DEFINITION_QUERY_PATTERN.match(query):
+        return None
+    hits_by_role = {}
+    for match in _KEYWORD_ROUTING_SCANNER.finditer(query):
+        hits_by_role.setdefault(match.lastgroup, set()).add(match.group().lower())
+
+    if len(hits_by_role) != 1:
+        return None
+    role_value, hits = next(iter(hits_by_role.items()))
+    return AgentRole(role_value) if len(hits) >= KEYWORD_ROUTING_MIN_HITS else None
+
+
+# Vocabulary for the local classification tier and the keyword fallback
+CYBERSEC_KEYWORDS = frozenset({
+    "security", "breach", "malware", "vulnerability", "incident", "threat",
+    "phishing", "ransomware", "firewall", "encryption", "compliance",
+    "gdpr", "hipaa", "nist", "iso", "attack", "hack", "exploit"
+})
+LOCAL_CLASSIFIER_MIN_HITS = 2
+# Queries this short count as security-related on a single keyword or artifact hit
+TRIVIAL_QUERY_MAX_WORDS = 2
+# The only queries rejected locally are ones made up entirely of these words
+CHIT_CHAT_WORDS = frozenset({
+    "hi", "hello", "hey", "yo", "hiya", "greetings", "thanks", "thank", "you", "thx", "ty",
+    "cheers", "ok", "okay", "k", "cool", "nice", "great", "bye", "goodbye", "later",
+    "good", "morning", "afternoon", "evening", "night", "yes", "no", "sure", "please"
+})
+_WORD_PATTERN = re.compile(r"[a-z0-9-]+")
+_SECURITY_ARTIFACT_PATTERN = re.compile(
+    r"cve-\d{4}-\d+|\b(?:\d{1,3}\.){3}\d{1,3}\b|\b[a-f0-9]{32,64}\b"
+)
+
+
+def _local_cybersecurity_classification(query: str) -> Optional[bool]:
+    """
+    Cheap first classification tier. Returns True when the query is confidently
+    cybersecurity-related, False only for pure chit-chat, and None when the LLM must decide.
+
+    A query is only rejected when every word is on the chit-chat allowlist; terse or
+    topic-crossing security questions ("explain CSRF", "is streaming on public wifi safe")
+    are left to the classifier.
+    """
+    query_lower = query.lower()
+    words = _WORD_PATTERN.findall(query_lower)
+    hits = CYBERSEC_KEYWORDS.intersection(words)
+    if len(hits) >= LOCAL_CLASSIFIER_MIN_HITS:
+        return True
+
+    has_security_signal = bool(
+        hits
+        or _KEYWORD_ROUTING_SCANNER.search(query_lower)
+        or _SECURITY_ARTIFACT_PATTERN.search(query_lower)
+    )
+    if len(words) <= TRIVIAL_QUERY_MAX_WORDS and has_security_signal:
+        return True
+    return False if CHIT_CHAT_WORDS.issuperset(words) else None
+
+
+# Transient provider failures and malformed structured output are worth retrying
+ROUTER_RETRYABLE_ERRORS = (
+    ValidationError, RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+)
+
+
+def _router_retrying(attempts: int) -> AsyncRetrying:
+    """Retry policy for router LLM calls: exponential backoff with jitter, then re-raise."""
+    return AsyncRetrying(
+        retry=retry_if_exception_type(ROUTER_RETRYABLE_ERRORS),
+        wait=wait_exponential_jitter(initial=0.5, max=10),
+        stop=stop_after_attempt(attempts),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+
+
+async def _hedged(call: Callable[[], Awaitable[Any]], hedge_after: float) -> Any:
+    """
+    Runs call(), and if it hasn't finished after hedge_after seconds starts a second
+    identical call; returns whichever finishes first and cancels the other.
+    """
+    first = asyncio.ensure_future(call())
+    if hedge_after <= 0:
+        return await first
+
+    # Everything after the first call starts is inside the try, so a cancelled caller
+    # never leaves either request running
+    pending = {first}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        logger.info("Routing call still running after %ss, sending a hedged request", hedge_after)
+        pending.add(asyncio.ensure_future(call()))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    return task.result()
+            if not pending:
+                # Both failed; surface the original request's error
+                return first.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+@functools.lru_cache(maxsize=None)
+def _routing_cache_store(path: str, ttl_seconds: float, max_entries: int) -> SQLiteCache:
+    """One SQLite connection per cache file, shared by every router in the process."""
+    return SQLiteCache(path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+
+@functools.lru_cache(maxsize=1)
+def _routing_embedder() -> TextEmbedding:
+    """Small local embedding model for the semantic routing cache, loaded on first use."""
+    return TextEmbedding(model_name="BAAI/bge-small-en-v1.5", cache_dir="./embedding_cache")
+
+
+@functools.lru_cache(maxsize=256)
+def _embed_query(query: str):
+    # Cached so the embedding classifier and the semantic cache share one embedding per query
+    return next(iter(_routing_embedder().embed([query])))
+
+
+# Labelled examples for the optional embedding classifier tier
+EMBEDDING_CLASSIFIER_EXAMPLES = {
+    True: [
+        "Our server was hit by ransomware, what should we do first?",
+        "How do I detect phishing emails targeting our staff?",
+        "What are the GDPR breach notification requirements?",
+        "Explain how to harden a Linux web server",
+        "Is this IP address associated with known malware?",
+        "Which threat actors are exploiting this new VPN vulnerability?",
+        "How should we set up multi-factor authentication for admins?",
+        "Someone logged into my account from another country",
+        "What does the NIST cybersecurity framework cover?",
+        "How do I respond to a data breach at my company?",
+    ],
+    False: [
+        "What's the weather like tomorrow?",
+        "Can you recommend a good pasta recipe?",
+        "Tell me a joke",
+        "How do I convert Celsius to Fahrenheit?",
+        "Who won the football match last night?",
+        "Help me write a birthday message for my friend",
+        "What time is it in Tokyo?",
+        "Summarize the plot of a famous novel",
+        "How do I make a pivot table in a spreadsheet?",
+        "What are some good exercises for back pain?",
+    ],
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _embedding_classifier() -> PrototypeClassifier:
+    return PrototypeClassifier.from_examples(
+        lambda texts: _routing_embedder().embed(texts), EMBEDDING_CLASSIFIER_EXAMPLES
+    )
+
+
+def _embedding_classification(query: str) -> Optional[bool]:
+    """Local embedding tier: the nearest class when its margin is decisive, otherwise None."""
+    is_cybersec, margin = _embedding_classifier().predict(_embed_query(query))
+    return is_cybersec if margin >= settings.embedding_classifier_min_margin else None
+
+
+def _cache_namespace(llm: ChatOpenAI, prompt: str) -> str:
+    """Ties persisted routing results to the model and prompt version that produced them."""
+    prompt_version = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+    return f"{getattr(llm, 'model_name', '')}:{prompt_version}"
+
+
+def _normalize_query(query: str) -> str:
+    """Normalizes case and whitespace so trivially different queries share cache entries."""
+    return " ".join(query.lower().split())
+
+
+@dataclass(frozen=True, slots=True)
 class FollowUpIndicators:
     """Encapsulates logic for detecting follow-up queries"""
-    strong_followup_phrases: List[str]
-    new_topic_phrases: List[str]
+    strong_followup_phrases: Tuple[str, ...]
+    new_topic_phrases: Tuple[str, ...]
+    _followup_pattern: re.Pattern = field(init=False, repr=False)
+    _new_topic_pattern: re.Pattern = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Phrases are immutable; compile each set into one substring scan (frozen, hence object.__setattr__)
+        object.__setattr__(self, "_followup_pattern", self._compile(self.strong_followup_phrases))
+        object.__setattr__(self, "_new_topic_pattern", self._compile(self.new_topic_phrases))
+    
+    @staticmethod
+    def _compile(phrases: Tuple[str, ...]) -> re.Pattern:
+        # Longest first so overlapping phrases can't shadow each other; (?!) never matches
+        alternatives = sorted(set(phrases), key=len, reverse=True)
+        return re.compile("|".join(map(re.escape, alternatives)) or "(?!)")
+    
+    def has_followup_phrase(self, query_lower: str) -> bool:
+        return self._followup_pattern.search(query_lower) is not None
+    
+    def has_new_topic_phrase(self, query_lower: str) -> bool:
+        return self._new_topic_pattern.search(query_lower) is not None
     
     @classmethod
     def default(cls):
         return cls(
-            strong_followup_phrases=[
+            strong_followup_phrases=(
                 # Direct references to previous conversation
                 "how do i", "how can i", "what's the next step", "next step",
                 "how to", "walk me through", "guide me through", "show me how",
@@ -45,8 +314,8 @@ class FollowUpIndicators:
                 # Implementation questions
                 "how do i implement", "how do i configure", "how do i set up",
                 "where do i find", "which tool", "what command",
-            ],
-            new_topic_phrases=[
+            ),
+            new_topic_phrases=(
                 # Compliance topics
                 "gdpr", "hipaa", "pci-dss", "compliance", "regulation", "audit",
                 "policy", "governance", "legal", "privacy law",
@@ -63,7 +332,7 @@ class FollowUpIndicators:
                 # General "what is" questions about different domains
                 "what is nist", "what is iso", "what is zero trust",
                 "tell me about", "explain", "what are the", "define"
-            ]
+            )
         )
 
 
@@ -73,21 +342,52 @@ from workflow.system_prompts import PromptFormatter, SystemMessages, RouterPromp
 class QueryRouter:
     """Routes queries to appropriate cybersecurity agents using a semantic, LLM-based approach."""
     
-    def __init__(self, llm_client: ChatOpenAI, toolkit: CybersecurityToolkit):
+    def __init__(
+        self,
+        llm_client: ChatOpenAI,
+        toolkit: CybersecurityToolkit,
+        small_llm_client: Optional[ChatOpenAI] = None
+    ):
         """Initialize the router with LangChain structured output capabilities and cybersecurity tools."""
         self.base_llm = llm_client
         self.toolkit = toolkit
         
+        # The binary pre-check runs on a cheaper model; low-confidence answers escalate to llm_client
+        self.small_llm = small_llm_client or ChatOpenAI(
+            model=settings.router_classification_model_name,
+            temperature=0,
+            http_async_client=get_openai_http_client()
+        )
         self.classification_llm = llm_client.with_structured_output(CybersecurityClassification)
+        self.batch_classification_llm = self.small_llm.with_structured_output(BatchCybersecurityClassification)
+        # Single classifications are three flat fields, so plain JSON mode avoids the tool-schema tokens
+        self.classification_json_llm = self.small_llm.bind(response_format={"type": "json_object"})
         self.routing_llm = llm_client.with_structured_output(RoutingDecision)
+        self.triage_llm = llm_client.with_structured_output(TriageDecision)
+        self.small_triage_llm = self.small_llm.with_structured_output(TriageDecision)
         
-        self.direct_llm = llm_client.bind_tools([
+        direct_tools = [
             self.toolkit.get_tool_by_name("web_search"),
             self.toolkit.get_tool_by_name("knowledge_search")
-        ])
+        ]
+        self.direct_llm = llm_client.bind_tools(direct_tools)
+        self._tool_map = {tool.name: tool for tool in direct_tools if tool}
         
         self.followup_indicators = FollowUpIndicators.default()
         
+        # Concurrent classifications arriving within a few ms share one LLM request
+        self._classification_batcher = AsyncBatcher(
+            self._classify_batch, max_batch=16, max_wait_ms=20, flush_when_idle=True
+        )
+        
+        # Near-duplicate phrasings of a routed query reuse its decision without any LLM call
+        self._semantic_cache = SemanticCache(
+            max_entries=settings.semantic_routing_cache_size,
+            threshold=settings.semantic_routing_cache_threshold
+        ) if settings.semantic_routing_cache_enabled else None
+        # LLM routing already in flight, keyed by normalized query; concurrent duplicates share it
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
         # This is no longer the primary source of truth, but a fallback/supplement.
         self.agent_expertise = {
             AgentRole.INCIDENT_RESPONSE: "Handles active security incidents, breaches, malware infections, and suspicious activities. Also checks for data exposure and whether credentials have been compromised in known breaches.",
@@ -95,6 +395,59 @@ class QueryRouter:
             AgentRole.THREAT_INTEL: "Analyzes threat actors, TTPs, and campaigns. Also investigates potential data exposures and tracks breach intelligence.",
             AgentRole.COMPLIANCE: "Specializes in regulatory frameworks (GDPR, HIPAA, PCI-DSS), policies, and audits. Provides guidance on governance and compliance obligations."
         }
+        
+        # Roles the router may hand off to; triage output is filtered against this set
+        self._valid_agent_roles = frozenset(self.agent_expertise)
+        
+        # Speaking-order position of each role, used to pick the primary agent
+        self._speak_rank = {
+            role: rank for rank, role in enumerate(INTERACTION_RULES.get("speaking_order", []))
+        }
+        
+        # Everything except the query is static, so it is rendered once and sent as a
+        # byte-identical system message that the provider's prompt cache can reuse
+        triage_instructions = SystemMessages.SOC_TRIAGE_SYSTEM + "\n" + PromptFormatter.format_triage_instructions(
+            self._build_agent_capabilities_description(),
+            compact=settings.compact_triage_prompt_enabled
+        )
+        self._triage_system = SystemMessage(content=triage_instructions)
+        # The full prompt already carries the worked examples; the compact one adds them on retry
+        self._triage_retry_system = (
+            SystemMessage(content=triage_instructions + RouterPrompts.TRIAGE_EXAMPLES)
+            if settings.compact_triage_prompt_enabled else self._triage_system
+        )
+        self._fused_triage_system = SystemMessage(content=triage_instructions + RouterPrompts.FUSED_TRIAGE_ADDENDUM)
+        self._classification_system = SystemMessage(content=RouterPrompts.CLASSIFICATION_SYSTEM)
+        self._direct_system = SystemMessage(content=RouterPrompts.DIRECT_RESPONSE)
+        
+        # Classification and triage depend only on the query text, so repeats skip the LLM
+        self._classification_cache = self._build_routing_cache(
+            namespace=_cache_namespace(self.small_llm, RouterPrompts.CLASSIFICATION_SYSTEM),
+            encode=json.dumps,
+            decode=json.loads
+        )
+        self._triage_cache = self._build_routing_cache(
+            namespace=_cache_namespace(self.base_llm, self._fused_triage_system.content),
+            encode=lambda decision: decision.model_dump_json(),
+            decode=RoutingDecision.model_validate_json
+        )
+
+    @staticmethod
+    def _build_routing_cache(namespace: str, encode, decode) -> LRUCache:
+        """In-memory LRU, backed by the shared SQLite store when ROUTING_CACHE_PATH is set."""
+        if not settings.routing_cache_path:
+            return LRUCache(max_entries=settings.routing_cache_size, ttl_seconds=settings.routing_cache_ttl_seconds)
+        return PersistentLRUCache(
+            # The classification and triage caches share one file, so it holds room for both
+            store=_routing_cache_store(
+                settings.routing_cache_path, settings.routing_cache_ttl_seconds, 2 * settings.routing_cache_size
+            ),
+            namespace=namespace,
+            encode=encode,
+            decode=decode,
+            max_entries=settings.routing_cache_size,
+            ttl_seconds=settings.routing_cache_ttl_seconds
+        )
 
     async def determine_routing_strategy(self, query: str, context_hint: Optional[str] = None, active_agent: Optional[AgentRole] = None) -> RoutingDecision:
         """
@@ -111,10 +464,10 @@ class QueryRouter:
         """
         # PRIORITY 1: Context-aware routing - Only for TRUE follow-ups to the same topic
         if context_hint and context_hint != "general" and active_agent:
-            logger.info(f"🔗 Checking if this is a follow-up to {active_agent} ({context_hint})")
+            logger.info("🔗 Checking if this is a follow-up to %s (%s)", active_agent, context_hint)
             
             if self._is_true_followup_query(query, context_hint, active_agent):
-                logger.info(f"🔗 CONTEXT PRIORITY: True follow-up detected - continuing with {active_agent}")
+                logger.info("🔗 CONTEXT PRIORITY: True follow-up detected - continuing with %s", active_agent)
                 
                 return RoutingDecision(
                     response_strategy=ResponseStrategy.SINGLE_AGENT,
@@ -125,20 +478,112 @@ class QueryRouter:
             else:
                 logger.info("New cybersecurity topic detected - routing based on query content")
         
-        # PRIORITY 2: Cybersecurity classification (for new topics or no context)
-        is_cybersec = await self._classify_cybersecurity_query(query)
-        
-        if not is_cybersec:
-            logger.info(f"Routing '{query}' to general assistant")
+        # PRIORITY 2: Obvious single-domain queries skip both LLM calls
+        keyword_role = _keyword_route(query)
+        if keyword_role:
+            logger.info("Keyword routing matched '%.50s' to %s", query, keyword_role.value)
             return RoutingDecision(
-                response_strategy=ResponseStrategy.GENERAL_QUERY,
-                relevant_agents=[],
-                reasoning="Non-cybersecurity query - routing to general assistant mode",
+                response_strategy=ResponseStrategy.SINGLE_AGENT,
+                relevant_agents=[keyword_role],
+                reasoning=f"Query clearly matches {keyword_role.value.replace('_', ' ')} terminology",
                 estimated_complexity="simple"
             )
+
+        # PRIORITY 3: Greetings and other trivial chit-chat never reach an LLM
+        if _local_cybersecurity_classification(query) is False:
+            logger.info("Prefilter: '%.50s' is trivially non-cybersecurity", query)
+            return self._general_query_decision("Non-cybersecurity query - routing to general assistant mode")
+        
+        return await self._route_once(query)
+
+    async def _route_once(self, query: str) -> RoutingDecision:
+        """Runs LLM routing for a query, letting concurrent identical queries await the same call."""
+        key = _normalize_query(query)
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.info("Joining in-flight routing for '%.50s'", query)
+        else:
+            # The call runs as its own task so cancelling whichever caller started it
+            # doesn't cancel it for the others waiting on the same query
+            task = asyncio.ensure_future(self._route_with_llm(query))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_inflight(key, done))
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, key: str, task: asyncio.Future) -> None:
+        """Drops a finished routing task from the in-flight map."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved so a call whose callers all went away doesn't log a warning
+        if not task.cancelled():
+            task.exception()
+
+    async def _route_with_llm(self, query: str) -> RoutingDecision:
+        """LLM-backed routing, consulting the semantic cache when the exact caches miss."""
+        if self._semantic_cache is None or self._has_exact_routing_result(query):
+            return await self._route_uncached(query)
+        
+        try:
+            vector = await asyncio.to_thread(_embed_query, query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed, skipping the semantic routing cache: {e}")
+            return await self._route_uncached(query)
+        
+        match = self._semantic_cache.lookup(vector)
+        if match is not None:
+            logger.info("Semantic routing cache hit for '%.50s': %s", query, match.response_strategy)
+            return match
+        
+        decision = await self._route_uncached(query)
+        # Only decisions the LLM actually produced are shared; error fallbacks are never cached
+        if self._has_exact_routing_result(query):
+            self._semantic_cache.add(vector, decision)
+        return decision
+
+    def _has_exact_routing_result(self, query: str) -> bool:
+        """True when the exact-match caches already hold an LLM routing result for the query."""
+        key = _normalize_query(query)
+        return self._triage_cache.get(key) is not None or self._classification_cache.get(key) is False
+
+    async def _route_uncached(self, query: str) -> RoutingDecision:
+        """LLM-backed routing for queries the local tiers could not decide."""
+        if await self._embedding_verdict(query) is False:
+            logger.info("Embedding classifier: '%.50s' is not cybersecurity-related", query)
+            self._classification_cache.set(_normalize_query(query), False)
+            return self._general_query_decision("Non-cybersecurity query - routing to general assistant mode")
+        
+        # PRIORITY 4: One LLM call that both classifies and triages the query
+        fused_decision = await self._fused_triage(query)
+        if fused_decision:
+            return fused_decision
+        
+        # PRIORITY 5: Separate classification and triage calls if the fused call failed.
+        # Triage starts speculatively alongside classification and is cancelled if unneeded.
+        triage_task = asyncio.create_task(self._perform_cybersecurity_triage(query))
+        try:
+            is_cybersec = await self._classify_cybersecurity_query(query)
+        except BaseException:
+            triage_task.cancel()
+            raise
+        
+        if not is_cybersec:
+            triage_task.cancel()
+            logger.info("Routing '%s' to general assistant", query)
+            return self._general_query_decision("Non-cybersecurity query - routing to general assistant mode")
         
-        # If cybersecurity-related, use normal triage
-        return await self._perform_cybersecurity_triage(query)
+        # If cybersecurity-related, use the triage that has been running in parallel
+        decision = await triage_task
+        if decision is None:
+            # Graceful fallback to single agent strategy
+            return RoutingDecision(
+                response_strategy=ResponseStrategy.SINGLE_AGENT,
+                relevant_agents=[AgentRole.INCIDENT_RESPONSE],
+                reasoning="Fallback due to routing error",
+                estimated_complexity="moderate"
+            )
+        # Cached only now that classification has confirmed the query is security-related
+        self._triage_cache.set(_normalize_query(query), decision)
+        return decision
 
     async def determine_relevant_agents(self, query: str) -> List[AgentRole]:
         """
@@ -175,9 +620,8 @@ class QueryRouter:
         return "\n".join(agent_capabilities)
 
     def _build_triage_prompt(self, query: str) -> str:
-        """Constructs the intelligent triage prompt using centralized prompts"""
-        agent_capabilities = self._build_agent_capabilities_description()
-        return PromptFormatter.format_triage_prompt(query, agent_capabilities)
+        """Constructs the per-request part of the triage prompt; the instructions live in the system message"""
+        return RouterPrompts.TRIAGE_QUERY.format(query=query)
 
     def _is_true_followup_query(self, query: str, context_hint: str, active_agent: AgentRole) -> bool:
         """
@@ -186,81 +630,137 @@ class QueryRouter:
         """
         query_lower = query.lower()
         
-        # Use the structured indicators
-        has_followup_phrase = any(
-            phrase in query_lower 
-            for phrase in self.followup_indicators.strong_followup_phrases
-        )
-        has_new_topic_phrase = any(
-            phrase in query_lower 
-            for phrase in self.followup_indicators.new_topic_phrases
+        # A new-topic phrase wins over any follow-up phrase, so it is checked first
+        if self.followup_indicators.has_new_topic_phrase(query_lower):
+            return False  # Clear new topic
+        if self.followup_indicators.has_followup_phrase(query_lower):
+            return True  # Clear follow-up
+        
+        # Very short queries are usually follow-ups; default to new topic for longer, unclear queries
+        return len(query.split()) <= 5
+
+    @staticmethod
+    def _general_query_decision(reasoning: str) -> RoutingDecision:
+        return RoutingDecision(
+            response_strategy=ResponseStrategy.GENERAL_QUERY,
+            relevant_agents=[],
+            reasoning=reasoning,
+            estimated_complexity="simple"
         )
+
+    async def _fused_triage(self, query: str) -> Optional[RoutingDecision]:
+        """
+        Classifies and triages a query in a single structured LLM call.
+        Returns None when the call fails or is inconsistent, so the caller can fall back
+        to the separate classification and triage calls.
+        """
+        cache_key = _normalize_query(query)
+        if self._classification_cache.get(cache_key) is False:
+            return self._general_query_decision("Non-cybersecurity query - routing to general assistant mode")
+        cached = self._triage_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Triage cache hit for '%.50s': %s", query, cached.response_strategy)
+            return cached
         
-        # Apply the decision logic
-        is_short_query = len(query.split()) <= 10
+        try:
+            messages = [self._fused_triage_system, HumanMessage(content=self._build_triage_prompt(query))]
+            first_tier = self.small_triage_llm if settings.triage_cascade_enabled else self.triage_llm
+            async for attempt in _router_retrying(attempts=2):
+                with attempt:
+                    triage = await _hedged(
+                        lambda: first_tier.ainvoke(messages), settings.router_hedge_after_seconds
+                    )
+        except Exception as e:
+            logger.warning(f"Fused triage failed, falling back to separate calls: {e}")
+            return None
         
-        if has_followup_phrase and not has_new_topic_phrase:
-            return True  # Clear follow-up
-        elif has_new_topic_phrase:
-            return False  # Clear new topic
-        elif is_short_query and has_followup_phrase:
-            return True  # Short follow-up question
-        elif len(query.split()) <= 5:
-            return True  # Very short queries are usually follow-ups
-        else:
-            return False  # Default to new topic for longer, unclear queries
+        if settings.triage_cascade_enabled:
+            triage = await self._escalate_triage(query, messages, triage)
+        
+        logger.info("Fused triage for '%.50s': cybersecurity=%s, %s - %s", query,
+                    triage.is_cybersecurity_related, triage.response_strategy, triage.reasoning)
+        self._classification_cache.set(cache_key, triage.is_cybersecurity_related)
+        
+        if not triage.is_cybersecurity_related or triage.response_strategy == ResponseStrategy.GENERAL_QUERY:
+            return self._general_query_decision(triage.reasoning)
+        
+        try:
+            decision = RoutingDecision(
+                response_strategy=triage.response_strategy,
+                relevant_agents=[role for role in triage.relevant_agents if role in self._valid_agent_roles],
+                reasoning=triage.reasoning,
+                estimated_complexity=triage.estimated_complexity
+            )
+        except ValidationError as e:
+            logger.warning(f"Fused triage returned an inconsistent decision, falling back: {e}")
+            return None
+        
+        self._triage_cache.set(cache_key, decision)
+        return decision
+
+    @staticmethod
+    def _needs_triage_escalation(triage: TriageDecision) -> bool:
+        """
+        Complex cybersecurity queries, agent strategies with no agents, and non-cybersecurity
+        verdicts go to the main model. The small model's triage carries no confidence, so a
+        rejection is always confirmed rather than trusted outright.
+        """
+        if not triage.is_cybersecurity_related:
+            return True
+        missing_agents = (
+            triage.response_strategy in (ResponseStrategy.SINGLE_AGENT, ResponseStrategy.MULTI_AGENT)
+            and not triage.relevant_agents
+        )
+        return missing_agents or triage.estimated_complexity == ComplexityLevel.COMPLEX
+
+    async def _escalate_triage(self, query: str, messages: list, triage: TriageDecision) -> TriageDecision:
+        """Second cascade tier: re-runs a small-model triage on the main model when it needs escalating."""
+        if not self._needs_triage_escalation(triage):
+            logger.info("Triage tier for '%.50s': small", query)
+            return triage
+        
+        logger.info("Triage tier for '%.50s': escalated to main model", query)
+        try:
+            return await self.triage_llm.ainvoke(messages)
+        except Exception as e:
+            logger.warning(f"Triage escalation failed, keeping the small-model decision: {e}")
+            return triage
 
     async def _classify_cybersecurity_query(self, query: str) -> bool:
         """
         Extracted and simplified cybersecurity classification logic.
         Now more focused and easier to test.
         """
-        classification_prompt = f"""
-Analyze the following query and determine if it is cybersecurity-related.
-
-Query: "{query}"
-
-Consider these as cybersecurity-related:
-- Security threats, vulnerabilities, attacks
-- Data protection, privacy, encryption
-- Compliance, regulations (GDPR, HIPAA, etc.)
-- Incident response, forensics
-- Security tools, firewalls, monitoring
-- Risk assessment, security architecture
-- Authentication, authorization, access control
-
-Provide:
-1. is_cybersecurity_related: boolean
-2. confidence: float (0.0 to 1.0)
-3. reasoning: brief explanation (max 200 chars)
-"""
+        cache_key = _normalize_query(query)
+        cached = self._classification_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Classification cache hit for '%.50s': cybersecurity=%s", query, cached)
+            return cached
+        
+        local_verdict = _local_cybersecurity_classification(query)
+        if local_verdict is not None:
+            logger.info("Local classifier: '%.50s' cybersecurity=%s, skipping LLM", query, local_verdict)
+            self._classification_cache.set(cache_key, local_verdict)
+            return local_verdict
+        
+        embedding_verdict = await self._embedding_verdict(query)
+        if embedding_verdict is not None:
+            logger.info("Embedding classifier: '%.50s' cybersecurity=%s, skipping LLM", query, embedding_verdict)
+            self._classification_cache.set(cache_key, embedding_verdict)
+            return embedding_verdict
         
         try:
-
+            async for attempt in _router_retrying(attempts=2):
+                with attempt:
+                    classification = await self._classification_batcher.submit(query)
             
-            # Retry logic with LangChain structured output
-            for attempt in range(2):
-                try:
-
-                    classification = await self.classification_llm.ainvoke([
-                        SystemMessage(content="You are a cybersecurity query classifier. Provide structured classification results."),
-                        HumanMessage(content=classification_prompt)
-                    ])
-                    logger.info(f"Classification successful on attempt {attempt + 1}")
-                    break
-                except ValidationError as ve:
-                    logger.error(f"Classification ValidationError on attempt {attempt + 1}: {ve}")
-                    if attempt == 1:
-                        raise ve
-                except Exception as e:
-                    logger.error(f"Classification Exception on attempt {attempt + 1}: {type(e).__name__}: {e}")
-                    if attempt == 1:
-                        raise e
-                    logger.warning("Retrying classification...")
+            if classification.confidence < settings.classification_escalation_confidence:
+                classification = await self._escalate_classification(query, classification)
             
-            logger.info(f"Classification result for '{query}': cybersecurity={classification.is_cybersecurity_related} "
-                       f"(confidence: {classification.confidence:.2f}) - {classification.reasoning}")
+            logger.info("Classification result for '%s': cybersecurity=%s (confidence: %.2f) - %s", query,
+                        classification.is_cybersecurity_related, classification.confidence, classification.reasoning)
             
+            self._classification_cache.set(cache_key, classification.is_cybersecurity_related)
             return classification.is_cybersecurity_related
             
         except Exception as e:
@@ -271,6 +771,70 @@ Provide:
             # Use improved fallback logic
             return self._fallback_classification(query)
 
+    async def _escalate_classification(
+        self, query: str, classification: CybersecurityClassification
+    ) -> CybersecurityClassification:
+        """Re-runs a low-confidence classification on the main router model, keeping the original on failure."""
+        logger.info("Escalating classification for '%.50s' (confidence %.2f)", query, classification.confidence)
+        try:
+            return await self.classification_llm.ainvoke([
+                self._classification_system,
+                HumanMessage(content=RouterPrompts.CLASSIFICATION_QUERY.format(query=query))
+            ])
+        except Exception as e:
+            logger.warning(f"Classification escalation failed, keeping the small-model answer: {e}")
+            return classification
+
+    async def _embedding_verdict(self, query: str) -> Optional[bool]:
+        """Runs the optional embedding classifier off the event loop; None when disabled, unsure or failing."""
+        if not settings.embedding_classifier_enabled:
+            return None
+        try:
+            return await asyncio.to_thread(_embedding_classification, query)
+        except Exception as e:
+            logger.warning(f"Embedding classifier failed, deferring to the LLM: {e}")
+            return None
+
+    async def _classify_json(self, query: str) -> CybersecurityClassification:
+        """
+        Classifies one query in JSON mode. An invalid reply gets one self-repair turn that
+        quotes the validation error back to the model before the error is raised.
+        """
+        messages = [
+            self._classification_system,
+            HumanMessage(content=RouterPrompts.CLASSIFICATION_JSON_QUERY.format(query=query))
+        ]
+        reply = await self.classification_json_llm.ainvoke(messages)
+        try:
+            return CybersecurityClassification.model_validate_json(reply.content)
+        except ValidationError as e:
+            logger.warning(f"Classification reply failed validation, asking for a repair: {e}")
+            messages += [reply, HumanMessage(content=RouterPrompts.CLASSIFICATION_REPAIR.format(error=e))]
+            repaired = await self.classification_json_llm.ainvoke(messages)
+            return CybersecurityClassification.model_validate_json(repaired.content)
+
+    async def _classify_batch(self, queries: List[str]) -> List[CybersecurityClassification]:
+        """Classifies one or more queries with a single structured LLM call, preserving order."""
+        if len(queries) == 1:
+            return [await self._classify_json(queries[0])]
+        
+        numbered_queries = "\n".join(f'{query_id}. "{query}"' for query_id, query in enumerate(queries, start=1))
+        batch = await self.batch_classification_llm.ainvoke([
+            self._classification_system,
+            HumanMessage(content=RouterPrompts.BATCH_CLASSIFICATION.format(
+                query_count=len(queries), queries=numbered_queries
+            ))
+        ])
+        
+        results_by_id = {item.id: item for item in batch.results}
+        missing = [query_id for query_id in range(1, len(queries) + 1) if query_id not in results_by_id]
+        if missing:
+            raise ValueError(f"Batch classification returned no result for queries {missing}")
+        return [
+            CybersecurityClassification(**results_by_id[query_id].model_dump(exclude={"id"}))
+            for query_id in range(1, len(queries) + 1)
+        ]
+
     def _fallback_classification(self, query: str) -> bool:
         """Improved fallback classification logic"""
         # Conservative fallback - default to non-cybersecurity for very short queries
@@ -278,15 +842,10 @@ Provide:
             logger.warning(f"Very short query '{query}' - assuming non-cybersecurity as fallback")
             return False
         
-        # Simple keyword-based fallback for longer queries
-        cybersec_keywords = {
-            "security", "breach", "malware", "vulnerability", "incident", "threat",
-            "phishing", "ransomware", "firewall", "encryption", "compliance",
-            "gdpr", "hipaa", "nist", "iso", "attack", "hack", "exploit"
-        }
-        query_words = set(query.lower().split())
-        
-        has_cybersec_keywords = bool(cybersec_keywords & query_words)
+        # Simple keyword-based fallback for longer queries; stops at the first keyword
+        has_cybersec_keywords = any(
+            match.group() in CYBERSEC_KEYWORDS for match in _WORD_PATTERN.finditer(query.lower())
+        )
         
         if has_cybersec_keywords:
             logger.warning(f"Fallback: Found cybersecurity keywords in '{query}' - assuming cybersecurity")
@@ -295,41 +854,39 @@ Provide:
             logger.warning(f"Fallback: No cybersecurity keywords in '{query}' - assuming general")
             return False
 
-    async def _perform_cybersecurity_triage(self, query: str) -> RoutingDecision:
-        """Separated cybersecurity triage logic for better organization"""
+    async def _perform_cybersecurity_triage(self, query: str) -> Optional[RoutingDecision]:
+        """
+        Separated cybersecurity triage logic for better organization.
+        Runs speculatively before classification finishes, so it leaves caching to the caller
+        and returns None when the call fails.
+        """
+        cache_key = _normalize_query(query)
+        cached = self._triage_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Triage cache hit for '%.50s': %s", query, cached.response_strategy)
+            return cached
+        
         prompt = self._build_triage_prompt(query)
         
         try:
-            # Retry logic with LangChain structured output
-            for attempt in range(3):
-                try:
-                    decision = await self.routing_llm.ainvoke([
-                        SystemMessage(content=SystemMessages.SOC_TRIAGE_SYSTEM),
-                        HumanMessage(content=prompt)
-                    ])
-                    break
-                except Exception as e:
-                    if attempt == 2:  # Last attempt
-                        raise e
-                    logger.warning(f"Routing attempt {attempt + 1} failed: {e}, retrying...")
+            async for attempt in _router_retrying(attempts=3):
+                with attempt:
+                    # Retries add the worked examples that the first attempt goes without
+                    system = self._triage_system if attempt.retry_state.attempt_number == 1 else self._triage_retry_system
+                    messages = [system, HumanMessage(content=prompt)]
+                    decision = await _hedged(
+                        lambda: self.routing_llm.ainvoke(messages), settings.router_hedge_after_seconds
+                    )
             
-            logger.info(f"Triage decision for query '{query[:50]}...': {decision.response_strategy} - {decision.reasoning}")
+            logger.info("Triage decision for query '%.50s...': %s - %s", query, decision.response_strategy, decision.reasoning)
             
             # Filter out any roles that are not actual agents
-            valid_agents = [role for role in decision.relevant_agents if role in self.agent_expertise]
-            decision.relevant_agents = valid_agents
-            
-            return decision
+            valid_agents = [role for role in decision.relevant_agents if role in self._valid_agent_roles]
+            return decision.model_copy(update={"relevant_agents": valid_agents})
         
         except Exception as e:
             logger.error(f"Cybersecurity triage failed: {e}")
-            # Graceful fallback to single agent strategy
-            return RoutingDecision(
-                response_strategy=ResponseStrategy.SINGLE_AGENT,
-                relevant_agents=[AgentRole.INCIDENT_RESPONSE],
-                reasoning=f"Fallback due to routing error: {str(e)[:100]}",
-                estimated_complexity="moderate"
-            )
+            return None
 
     def get_primary_agent(self, agents: List[AgentRole]) -> AgentRole:
         """
@@ -342,76 +899,66 @@ Provide:
             logger.warning("No relevant agents identified by router. Defaulting to Incident Response.")
             return AgentRole.INCIDENT_RESPONSE
         
-        speaking_order = INTERACTION_RULES.get("speaking_order", [])
-        
-        for role in speaking_order:
-            if role in agents:
-                return role
-        
-        return agents[0]
+        # Roles missing from the speaking order rank last; min() keeps the first of ties
+        return min(agents, key=lambda role: self._speak_rank.get(role, len(self._speak_rank)))
 
-    @observe(name="router_direct_response")
-    async def direct_response(self, query: str) -> str:
+    @observe(name="router_direct_response_stream")
+    async def direct_response(self, query: str) -> AsyncIterator[str]:
         """
         Handle direct cybersecurity queries using router's knowledge and tools.
-        This is the fast path for simple cybersecurity questions.
+        This is the fast path for simple cybersecurity questions, streamed token by token.
         """
-        logger.info(f"🎯 Router handling direct cybersecurity query: {query[:50]}...")
-        
-        system_prompt = RouterPrompts.DIRECT_RESPONSE
+        logger.info("🎯 Router handling direct cybersecurity query: %.50s...", query)
         
+        streamed_any = False
         try:
-            # Use LLM with tools for direct response
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=query)
-            ]
+            messages = [self._direct_system, HumanMessage(content=query)]
             
-            # Initial response (may include tool calls)
-            response = await self.direct_llm.ainvoke(messages)
-            messages.append(response)
+            # Text streams straight through; tool-call chunks are merged until the turn ends
+            response = None
+            async for chunk in self.direct_llm.astream(messages):
+                response = chunk if response is None else response + chunk
+                if chunk.content:
+                    streamed_any = True
+                    yield chunk.content
             
-            # Handle tool calls if any
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                logger.info(f"Router making {len(response.tool_calls)} tool calls for direct response")
+            if response is not None and response.tool_calls:
+                messages.append(response)
+                logger.info("Router making %d tool calls for direct response", len(response.tool_calls))
                 
-                for tool_call in response.tool_calls:
-                    # Execute tool via toolkit
-                    tool_name = tool_call["name"]
-                    tool_args = tool_call["args"]
-                    tool_id = tool_call["id"]
-
-                    try:
-                        # Get the actual tool instance from toolkit
-                        tool = self.toolkit.get_tool_by_name(tool_name)
-                        if tool:
-                            # Execute the tool with real arguments
-                            real_result = await tool.ainvoke(tool_args)
-                            result = str(real_result)
-                        else:
-                            result = f"Tool {tool_name} not found in toolkit"
-                            
-                        messages.append(ToolMessage(
-                            content=result,
-                            tool_call_id=tool_id
-                        ))
-                    except Exception as tool_error:
-                        logger.error(f"Tool execution failed for {tool_name}: {tool_error}")
-                        messages.append(ToolMessage(
-                            content=f"Tool {tool_name} failed: {str(tool_error)}",
-                            tool_call_id=tool_id
-                        ))
+                # Tools are independent I/O, so they run concurrently; results keep call order
+                messages.extend(await asyncio.gather(
+                    *(self._execute_tool_call(tool_call) for tool_call in response.tool_calls)
+                ))
                 
-                # Get final response after tool execution
-                final_response = await self.direct_llm.ainvoke(messages)
-                answer = final_response.content
-            else:
-                # No tools needed, use direct response
-                answer = response.content
+                # Stream the final response after tool execution
+                async for chunk in self.direct_llm.astream(messages):
+                    if chunk.content:
+                        streamed_any = True
+                        yield chunk.content
             
             logger.info("Router provided direct cybersecurity response successfully")
-            return answer
             
         except Exception as e:
             logger.error(f"Router direct response failed: {e}")
-            return f"I encountered an issue processing your cybersecurity query. For immediate assistance, please consult with our security specialists. Error: {str(e)[:100]}"
\ No newline at end of file
+            if not streamed_any:
+                yield f"I encountered an issue processing your cybersecurity query. For immediate assistance, please consult with our security specialists. Error: {str(e)[:100]}"
+
+    @observe(name="router_direct_response")
+    async def direct_response_collected(self, query: str) -> str:
+        """Collects the streamed direct response into a single string."""
+        return "".join([token async for token in self.direct_response(query)])
+
+    async def _execute_tool_call(self, tool_call: dict) -> ToolMessage:
+        """Runs one tool call through the toolkit, reporting failures back to the LLM as the tool result."""
+        tool_name = tool_call["name"]
+        try:
+            tool = self._tool_map.get(tool_name)
+            if tool:
+                result = str(await tool.ainvoke(tool_call["args"]))
+            else:
+                result = f"Tool {tool_name} is not available for direct responses"
+        except Exception as tool_error:
+            logger.error(f"Tool execution failed for {tool_name}: {tool_error}")
+            result = f"Tool {tool_name} failed: {str(tool_error)}"
+        return ToolMessage(content=result, tool_call_id=tool_call["id"])
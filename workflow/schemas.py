@@ -2,11 +2,20 @@
 Enhanced schemas.py with improved organization and validation.
 """
 
-from typing import List, Optional, Dict, Union, Literal
-from pydantic import BaseModel, Field, validator, model_validator
+from typing import Annotated, List, Optional, Dict, Union, Literal
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from config.agent_config import AgentRole
 from datetime import datetime, timezone
 from enum import Enum
+from functools import partial
+
+# Timezone-aware UTC timestamp factory shared by the models below
+_utc_now = partial(datetime.now, timezone.utc)
+
+# Length-constrained reasoning strings shared by the classifier and routing models
+ShortReasoning = Annotated[str, Field(max_length=200)]
+ContinuityReasoning = Annotated[str, Field(max_length=300)]
+DecisionReasoning = Annotated[str, Field(min_length=1, max_length=500)]
 
 
 # =============================================================================
@@ -43,21 +52,26 @@ class SpecialistContext(str, Enum):
 
 class SearchIntentResult(BaseModel):
     """Result of LLM-based search intent analysis."""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     needs_web_search: bool = Field(description="Whether the query needs current web information")
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence in the assessment")
-    reasoning: str = Field(max_length=200, description="Brief explanation of why web search is/isn't needed")
+    reasoning: ShortReasoning = Field(description="Brief explanation of why web search is/isn't needed")
 
 
 class ToolUsage(BaseModel):
     """Represents a tool that was used by an agent during analysis."""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     tool_name: str = Field(..., min_length=1, description="The name of the tool that was used")
     tool_result: str = Field(..., description="The result returned by the tool")
     timestamp: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
+        default_factory=_utc_now,
         description="When the tool was executed"
     )
 
-    @validator('tool_result')
+    @field_validator('tool_result')
+    @classmethod
     def validate_result_length(cls, v):
         """Ensure tool results aren't excessively long"""
         if len(v) > 10000:  # 10KB limit
@@ -116,7 +130,8 @@ class AgentResponse(BaseModel):
             raise ValueError("Either 'content' or 'summary' must be provided")
         return self
 
-    @validator('recommendations')
+    @field_validator('recommendations')
+    @classmethod
     def validate_recommendations(cls, v):
         """Ensure each recommendation is meaningful"""
         return [rec.strip() for rec in v if rec.strip()]
@@ -136,7 +151,7 @@ class TeamResponse(BaseModel):
         description="A list of tools used by the agent during its analysis"
     )
     timestamp: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
+        default_factory=_utc_now,
         description="The timestamp of when the response was generated"
     )
 
@@ -148,6 +163,19 @@ class TeamResponse(BaseModel):
             self.tools_used = self.response.tools_used
         return self
 
+    @classmethod
+    def from_agent_response(cls, agent_name: str, agent_role: AgentRole, response: AgentResponse) -> "TeamResponse":
+        """
+        Wraps a response our own agent already validated, skipping a second validation pass.
+        Applies the same tools_used sync as the validator; use the constructor for untrusted data.
+        """
+        return cls.model_construct(
+            agent_name=agent_name,
+            agent_role=agent_role,
+            response=response,
+            tools_used=response.tools_used
+        )
+
 
 # =============================================================================
 # QUALITY AND VALIDATION MODELS
@@ -163,7 +191,8 @@ class QualityGateResult(BaseModel):
         description="Individual scores for each evaluation criterion (e.g., accuracy, actionability, completeness)"
     )
     
-    @validator('scores')
+    @field_validator('scores')
+    @classmethod
     def validate_scores(cls, v):
         """Ensure all individual scores are within valid range."""
         if v is not None:
@@ -195,6 +224,8 @@ class RAGRelevanceResult(BaseModel):
 
 class RAGGroundednessResult(BaseModel):
     """The result of a RAG groundedness check."""
+    model_config = ConfigDict(defer_build=True)
+
     grounded: bool = Field(description="Whether the answer is grounded in the provided context")
     feedback: str = Field(min_length=1, description="Detailed feedback on the groundedness")
 
@@ -205,35 +236,59 @@ class RAGGroundednessResult(BaseModel):
 
 class CybersecurityClassification(BaseModel):
     """Classification result for cybersecurity queries."""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     is_cybersecurity_related: bool = Field(description="Whether the query is cybersecurity-related")
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence score between 0 and 1")
-    reasoning: str = Field(max_length=200, description="Brief explanation of the classification")
+    reasoning: ShortReasoning = Field(description="Brief explanation of the classification")
+
+
+class BatchCybersecurityClassificationItem(CybersecurityClassification):
+    """Classification result for one query of a batched classification."""
+    id: int = Field(ge=1, description="The query number this classification belongs to, echoed from the prompt")
+
+
+class BatchCybersecurityClassification(BaseModel):
+    """Classification results for several queries classified in one call."""
+    results: List[BatchCybersecurityClassificationItem] = Field(description="One classification per query, in query order")
 
 
 class ContextContinuityCheck(BaseModel):
     """Result of checking if a query maintains cybersecurity conversation context."""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     is_follow_up: bool = Field(description="Whether this is a follow-up to a previous cybersecurity conversation")
     context_maintained: bool = Field(description="Whether the cybersecurity context is maintained")
     previous_context: Optional[str] = Field(default=None, description="Summary of previous cybersecurity context")
     specialist_context: SpecialistContext = Field(description="Type of specialist context")
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence in the continuity assessment")
-    reasoning: str = Field(max_length=300, description="Explanation of the continuity assessment")
+    reasoning: ContinuityReasoning = Field(description="Explanation of the continuity assessment")
+
+
+class TriageDecision(BaseModel):
+    """Cybersecurity classification and routing decided in a single LLM call."""
+    is_cybersecurity_related: bool = Field(description="Whether the query is cybersecurity-related")
+    response_strategy: ResponseStrategy = Field(description="Response strategy; general_query when not cybersecurity-related")
+    relevant_agents: List[AgentRole] = Field(
+        default_factory=list,
+        max_length=4,
+        description="Agent roles most relevant to the query; empty for direct and general queries"
+    )
+    reasoning: DecisionReasoning = Field(..., description="A brief explanation for the decision")
+    estimated_complexity: ComplexityLevel = Field(description="Complexity level")
 
 
 class RoutingDecision(BaseModel):
-    """The routing decision for a query."""
+    """The routing decision for a query. Frozen, so cached decisions can be shared without copying."""
+    model_config = ConfigDict(frozen=True)
+
     response_strategy: ResponseStrategy = Field(description="Response strategy")
     relevant_agents: List[AgentRole] = Field(
         default_factory=list,
         max_length=4,  # Reasonable limit - shouldn't need all agents
         description="A list of agent roles that are most relevant to handle the query"
     )
-    reasoning: str = Field(
-        ...,
-        max_length=500,
-        min_length=1,
-        description="A brief explanation for the routing decision"
-    )
+    reasoning: DecisionReasoning = Field(..., description="A brief explanation for the routing decision")
     estimated_complexity: ComplexityLevel = Field(description="Complexity level")
 
     @model_validator(mode='after')
@@ -282,7 +337,8 @@ class ChatResponse(BaseModel):
         description="A list of tool names used to generate the response"
     )
 
-    @validator('tools_used')
+    @field_validator('tools_used')
+    @classmethod
     def deduplicate_tools(cls, v):
         """Remove duplicate tool names"""
         return list(dict.fromkeys(v))  # Preserves order while removing duplicates
\ No newline at end of file
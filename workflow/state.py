@@ -1,17 +1,19 @@
 from typing import List, Optional
-from datetime import datetime, timezone
-from pydantic import BaseModel, Field
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
 from langgraph.graph import MessagesState
 from config.agent_config import AgentRole
-from .schemas import TeamResponse, SearchIntentResult
+from .schemas import TeamResponse, SearchIntentResult, ResponseStrategy, ComplexityLevel, _utc_now
 
 
 class ConversationTurn(BaseModel):
     """A single turn in the conversation history."""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     role: str = Field(..., description="The role of the speaker (user, assistant, system)")
     content: str = Field(..., description="The content of the message")
     timestamp: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
+        default_factory=_utc_now,
         description="When the message was created"
     )
     agent_used: Optional[AgentRole] = Field(
@@ -29,11 +31,11 @@ class WorkflowState(MessagesState):
     query: str = Field(..., description="The user's original query")
    
     # Triage and routing
-    response_strategy: Optional[str] = Field(
+    response_strategy: Optional[ResponseStrategy] = Field(
         None, 
         description="Response strategy: 'direct', 'single_agent', 'multi_agent', 'general_query'"
     )
-    estimated_complexity: Optional[str] = Field(
+    estimated_complexity: Optional[ComplexityLevel] = Field(
         None,
         description="Complexity level: 'simple', 'moderate', 'complex'"
     )
@@ -92,7 +94,7 @@ class WorkflowState(MessagesState):
         description="Unique identifier for this conversation thread"
     )
     started_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
+        default_factory=_utc_now,
         description="When the workflow was initiated"
     )
     completed_at: Optional[datetime] = Field(
@@ -3,7 +3,8 @@ Centralized system prompts for the cybersecurity team workflow.
 Organized by component and functionality for easy maintenance and iteration.
 """
 
-from typing import Dict
+from string import Formatter
+from typing import Dict, Optional, Tuple
 
 
 class RouterPrompts:
@@ -37,9 +38,6 @@ You are an intelligent SOC triage system. Your job is to determine the optimal r
 **Agent Specializations & Supporting Tools:**
 {agent_capabilities}
 
-**User Query:**
-"{query}"
-
 ---
 **Decision Framework:**
 1. **Analyze the user's query to understand the PRIMARY INTENT and CONTEXT**
@@ -75,6 +73,50 @@ You are an intelligent SOC triage system. Your job is to determine the optimal r
 - **Complex**: Multi-faceted incidents, cross-domain issues, strategic decisions
 
 Focus on matching USER INTENT to AGENT EXPERTISE, not user keywords to agent tools.
+"""
+
+    # Compact variant of TRIAGE_BASE with the same rules, selected by COMPACT_TRIAGE_PROMPT_ENABLED.
+    # TRIAGE_BASE stays the default so the two can be compared and rolled back.
+    TRIAGE_BASE_COMPACT = """
+Route cybersecurity queries to the agent whose primary role owns the user's intent.
+
+Strategies:
+1. direct: simple factual questions or definitions needing no specialist.
+2. single_agent: the query falls under one agent's area.
+3. multi_agent: the query spans several domains (e.g. breach response plus compliance).
+
+Agents:
+{agent_capabilities}
+
+Rules: choose by role expertise, not tool count; use tools only to confirm the agent can act. Explain the choice in terms of expertise.
+Complexity: simple = definitions/general guidance; moderate = single-domain analysis; complex = cross-domain or strategic.
+"""
+
+    # Worked examples for the compact prompt, which leaves them out; only added when a
+    # first attempt returned an invalid decision, so the common path stays short.
+    # TRIAGE_BASE already includes them.
+    TRIAGE_EXAMPLES = """
+**Example Reasoning Patterns:**
+
+✅ **Good**: "Route to INCIDENT_RESPONSE because **breach investigation and exposure checking is their primary responsibility**. They have the exposure_checker tool to execute this request."
+
+❌ **Bad**: "Route to INCIDENT_RESPONSE because they have the most tools available (5 tools vs 3 for others)."
+
+✅ **Good**: "Route to PREVENTION because **proactive security architecture and vulnerability management is their core expertise**. This aligns with the user's need for preventive controls."
+
+❌ **Bad**: "Route to PREVENTION because they have vulnerability_search and threat_feeds tools."
+"""
+
+    # The triage instructions are static and sent as the system message so the
+    # provider can cache them; only this part changes per request.
+    TRIAGE_QUERY = """**User Query:**
+"{query}"
+"""
+
+    FUSED_TRIAGE_ADDENDUM = """
+**Cybersecurity Classification (decide this first):**
+- Set `is_cybersecurity_related` to false for general questions (time, weather, directions), personal assistance, and technology or business questions unrelated to security. Then use the `general_query` strategy with no relevant agents.
+- Otherwise set it to true and choose DIRECT, SINGLE_AGENT or MULTI_AGENT as described above.
 """
 
     CLASSIFICATION = """
@@ -96,9 +138,47 @@ NOT CYBERSECURITY-RELATED includes:
 - General technology questions
 - Business questions unrelated to security
 
+Provide a classification with confidence score and reasoning.
+
 Query: "{query}"
+"""
 
-Provide a classification with confidence score and reasoning.
+    CLASSIFICATION_SYSTEM = """You are a cybersecurity query classifier. Provide structured classification results.
+
+Determine whether a query is cybersecurity-related.
+
+Consider these as cybersecurity-related:
+- Security threats, vulnerabilities, attacks
+- Data protection, privacy, encryption
+- Compliance, regulations (GDPR, HIPAA, etc.)
+- Incident response, forensics
+- Security tools, firewalls, monitoring
+- Risk assessment, security architecture
+- Authentication, authorization, access control
+
+Provide:
+1. is_cybersecurity_related: boolean
+2. confidence: float (0.0 to 1.0)
+3. reasoning: brief explanation (max 200 chars)
+"""
+
+    CLASSIFICATION_REPAIR = """Your previous reply was not valid: {error}
+Reply again with only a JSON object with the keys is_cybersecurity_related, confidence and reasoning.
+"""
+
+    CLASSIFICATION_QUERY = """Query: "{query}"
+"""
+
+    CLASSIFICATION_JSON_QUERY = """Query: "{query}"
+
+Respond with a JSON object containing exactly the keys is_cybersecurity_related, confidence and reasoning.
+"""
+
+    BATCH_CLASSIFICATION = """
+Classify each of the following {query_count} queries independently.
+Return exactly one result per query, in order, echoing each query's number in `id`.
+
+{queries}
 """
 
     DIRECT_RESPONSE = """
@@ -165,9 +245,7 @@ The web_search_tool is now generic and works for any type of query - you control
 """
 
     WEB_SEARCH_INTENT_ANALYSIS = """
-Analyze this query to determine if it requires web search for current/recent information.
-
-Query: "{query}"
+Analyze the query below to determine if it requires web search for current/recent information.
 
 Consider:
 1. Does this ask for current, recent, or latest information that changes frequently?
@@ -187,22 +265,24 @@ Examples that DON'T need web search:
 - "how to configure firewall rules"
 
 Respond with structured analysis of web search necessity.
+
+Query: "{query}"
 """
 
     CONTEXT_CONTINUITY_ANALYSIS = """
 Analyze whether the current query maintains cybersecurity conversation context and specialist expertise.
 
-**Recent Conversation History:**
-{conversation_history}
-
-**Current Query:**
-{current_query}
-
 **Assessment Criteria:**
 1. Is this a follow-up to a previous cybersecurity conversation?
 2. Does it maintain the specialized context (incident response, threat analysis, compliance, etc.)?
 3. Would a cybersecurity specialist need to provide expertise for this query?
 4. Does the query build on previous security analysis or recommendations?
+
+**Recent Conversation History:**
+{conversation_history}
+
+**Current Query:**
+{current_query}
 """
 
 
@@ -218,31 +298,68 @@ class SystemMessages:
     CONTEXT_CONTINUITY_EXPERT = "You are an expert at analyzing cybersecurity conversation context and specialist expertise continuity."
 
 
+class CompiledPrompt:
+    """
+    A prompt template parsed once at import, so rendering skips str.format's field parsing.
+
+    Supports the plain {name} placeholders these prompts use; rendering is one str.join
+    over the literal segments and the substituted values.
+    """
+    __slots__ = ("_parts",)
+
+    def __init__(self, template: str):
+        self._parts: Tuple[Tuple[str, Optional[str]], ...] = tuple(
+            (literal, field) for literal, field, _, _ in Formatter().parse(template)
+        )
+
+    def format(self, **values: str) -> str:
+        pieces = []
+        for literal, field in self._parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(str(values[field]))
+        return "".join(pieces)
+
+
+_TRIAGE_BASE = CompiledPrompt(RouterPrompts.TRIAGE_BASE)
+_TRIAGE_BASE_COMPACT = CompiledPrompt(RouterPrompts.TRIAGE_BASE_COMPACT)
+_TRIAGE_QUERY = CompiledPrompt(RouterPrompts.TRIAGE_QUERY)
+_CLASSIFICATION = CompiledPrompt(RouterPrompts.CLASSIFICATION)
+_WEB_SEARCH_INTENT_ANALYSIS = CompiledPrompt(NodePrompts.WEB_SEARCH_INTENT_ANALYSIS)
+_CONTEXT_CONTINUITY_ANALYSIS = CompiledPrompt(NodePrompts.CONTEXT_CONTINUITY_ANALYSIS)
+
+
 class PromptFormatter:
     """Utility methods for formatting prompts with dynamic content"""
     
     @staticmethod
     def format_triage_prompt(query: str, agent_capabilities: str) -> str:
         """Format the main triage prompt with query and capabilities"""
-        return RouterPrompts.TRIAGE_BASE.format(
-            query=query,
-            agent_capabilities=agent_capabilities
+        return (
+            PromptFormatter.format_triage_instructions(agent_capabilities)
+            + _TRIAGE_QUERY.format(query=query)
         )
     
+    @staticmethod
+    def format_triage_instructions(agent_capabilities: str, compact: bool = False) -> str:
+        """Format the static, query-independent part of the triage prompt"""
+        template = _TRIAGE_BASE_COMPACT if compact else _TRIAGE_BASE
+        return template.format(agent_capabilities=agent_capabilities)
+    
     @staticmethod
     def format_classification_prompt(query: str) -> str:
         """Format the classification prompt with query"""
-        return RouterPrompts.CLASSIFICATION.format(query=query)
+        return _CLASSIFICATION.format(query=query)
     
     @staticmethod
     def format_web_search_intent_prompt(query: str) -> str:
         """Format the web search intent analysis prompt"""
-        return NodePrompts.WEB_SEARCH_INTENT_ANALYSIS.format(query=query)
+        return _WEB_SEARCH_INTENT_ANALYSIS.format(query=query)
     
     @staticmethod
     def format_context_continuity_prompt(current_query: str, conversation_history: str) -> str:
         """Format the context continuity analysis prompt"""
-        return NodePrompts.CONTEXT_CONTINUITY_ANALYSIS.format(
+        return _CONTEXT_CONTINUITY_ANALYSIS.format(
             current_query=current_query,
             conversation_history=conversation_history
         )